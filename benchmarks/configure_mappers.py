@@ -0,0 +1,40 @@
+"""Benchmarks mapper configuration time for schemas with many flags.
+
+Creates a number of mapped classes, each with several column flags, and times
+`configure_mappers()`. With flag listeners dispatched per table, this should
+grow linearly with the number of models.
+"""
+
+import sys
+from time import perf_counter
+
+from sqlalchemy import Column, DateTime, Integer
+from sqlalchemy.orm import configure_mappers, declarative_base
+
+from sqlalchemy_hybrid_utils import column_flag
+
+
+def create_model(base, index, flag_count):
+    attrs = {"__tablename__": f"model_{index}", "id": Column(Integer, primary_key=True)}
+    for flag in range(flag_count):
+        column = attrs[f"column_{flag}"] = Column(DateTime)
+        attrs[f"flag_{flag}"] = column_flag(column)
+    return type(f"Model{index}", (base,), attrs)
+
+
+def main(model_count, flags_per_model):
+    base = declarative_base()
+    models = [
+        create_model(base, index, flags_per_model) for index in range(model_count)
+    ]
+    start = perf_counter()
+    configure_mappers()
+    elapsed = perf_counter() - start
+    flag_count = len(models) * flags_per_model
+    print(f"{model_count} models, {flag_count} flags: configured in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    model_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    flags_per_model = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    main(model_count, flags_per_model)
@@ -0,0 +1,50 @@
+"""Benchmarks defining a schema with many flags, as done when importing models.
+
+Creates a number of mapped classes, each with several column flags, and times
+their definition. This is done once with eagerly compiled flags, and once with
+lazy flags, which defer serializing and compiling their expressions until the
+mappers are configured and the flags are first used.
+"""
+
+import sys
+from time import perf_counter
+
+from sqlalchemy import Column, DateTime, Integer, Text, func
+from sqlalchemy.orm import declarative_base
+
+from sqlalchemy_hybrid_utils import column_flag
+
+
+def create_model(base, index, lazy):
+    content = Column(Text)
+    status = Column(Integer)
+    sent_at = Column(DateTime)
+    delivered_at = Column(DateTime)
+    attrs = {
+        "__tablename__": f"model_{index}",
+        "id": Column(Integer, primary_key=True),
+        "content": content,
+        "status": status,
+        "sent_at": sent_at,
+        "delivered_at": delivered_at,
+        "has_content": column_flag(content, lazy=lazy),
+        "is_active": column_flag(status.in_([1, 2, 3]), lazy=lazy),
+        "is_sent": column_flag(sent_at, default=func.now(), lazy=lazy),
+        "in_transit": column_flag(sent_at & ~delivered_at, lazy=lazy),
+    }
+    return type(f"Model{index}", (base,), attrs)
+
+
+def main(model_count):
+    for lazy in (False, True):
+        base = declarative_base()
+        start = perf_counter()
+        for index in range(model_count):
+            create_model(base, index, lazy)
+        elapsed = perf_counter() - start
+        mode = "lazy" if lazy else "eager"
+        print(f"{model_count} models, {mode} flags: defined in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
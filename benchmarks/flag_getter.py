@@ -0,0 +1,65 @@
+"""Benchmarks flag getters on loaded ORM instances.
+
+Compares the generic getter, which evaluates the compiled expression through
+the attribute resolver, with the specialized getter that is used for flags
+consisting of IS [NOT] NULL checks.
+"""
+
+from datetime import datetime
+from timeit import repeat
+
+from sqlalchemy import Column, DateTime, Integer, Text
+from sqlalchemy.orm import configure_mappers, declarative_base
+
+from sqlalchemy_hybrid_utils.derived_column import DerivedColumn
+from sqlalchemy_hybrid_utils.expression import Expression, rephrase_as_boolean
+
+Base = declarative_base()
+NUMBER = 1_000_000
+
+
+class Message(Base):
+    __tablename__ = "message"
+
+    id = Column(Integer, primary_key=True)
+    content = Column(Text)
+    sent_at = Column(DateTime)
+    delivered_at = Column("delivery_date", DateTime)
+
+
+def derived(expr):
+    return DerivedColumn(Expression(rephrase_as_boolean(expr)))
+
+
+def generic_getter(derived_column):
+    evaluate = derived_column.expression.template
+    columns = derived_column.expression.optimized.slot_columns
+    attribute_names = derived_column.resolver.attribute_names
+
+    def getter(orm_obj):
+        names = attribute_names(type(orm_obj))
+        return evaluate(lambda slot: getattr(orm_obj, names[columns[slot]]))
+
+    return getter
+
+
+def main():
+    flags = {
+        "has_content": derived(Message.__table__.c.content),
+        "in_transit": derived(
+            Message.__table__.c.sent_at & ~Message.__table__.c.delivery_date
+        ),
+    }
+    configure_mappers()
+    message = Message(content="Spam", sent_at=datetime.now(), delivered_at=None)
+    for name, flag in flags.items():
+        for kind, getter in [
+            ("generic", generic_getter(flag)),
+            ("specialized", flag.make_getter()),
+        ]:
+            best = min(repeat(lambda: getter(message), number=NUMBER, repeat=5))
+            print(f"{name:>12} {kind:>12}: {best / NUMBER * 1e9:6.1f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ from sqlalchemy import Column, DateTime, Integer, Text, create_engine, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session
 
-from sqlalchemy_hybrid_utils import column_flag
+from sqlalchemy_hybrid_utils import column_flag, count_flags
 
 Base = declarative_base()
 
@@ -13,6 +13,7 @@ class Article(Base):
     id = Column(Integer, primary_key=True)
     content = Column(Text)
     published_at = Column("publication_date", DateTime)
+    has_content = column_flag(content)
     is_published = column_flag(published_at, default=func.now())
 
 
@@ -26,8 +27,10 @@ def main():
     session.add_all([art1, art2])
     session.flush()
     count_total = session.query(Article).count()
-    count_published = session.query(Article).filter(Article.is_published).count()
+    flags = [Article.is_published, Article.has_content]
+    count_published, count_content = count_flags(session, Article, flags)
     print(f"Articles published out of total: {count_published}/{count_total}")
+    print(f"Articles with content out of total: {count_content}/{count_total}")
 
     assert art1.is_published
     assert not art2.is_published
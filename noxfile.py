@@ -19,6 +19,7 @@ def type(session, sqlalchemy):
 def test(session, sqlalchemy):
     args = session.posargs or ["--cov"]
     session.install("freezegun", "pytest", "coverage[toml]", "pytest-cov")
+    session.install("numpy", "pandas")
     session.install(f"sqlalchemy~={sqlalchemy}")
     session.install(".")
     session.run("pytest", *args)
@@ -1,19 +1,65 @@
-from typing import Any
+from typing import Any, Union
 
+from sqlalchemy.orm import ColumnProperty
 from sqlalchemy.sql.elements import ColumnElement
 
-from .derived_column import DerivedColumn
+from .derived_column import (
+    DerivedColumn,
+    FlagProperty,
+    strict_loading,
+    use_strict_loading,
+)
 from .expression import Expression, rephrase_as_boolean
-from .typing import HybridPropertyType
+from .functions import now_scope, register_function, register_operator, use_clock
+from .query import (
+    count_flags,
+    flag_attributes,
+    iter_flags,
+    load_flags,
+    translate_flags,
+    undefer_flags,
+)
+from .typing import ColumnPropertyType
 
 __version__ = "0.2.0"
+__all__ = (
+    "DerivedColumn",
+    "Expression",
+    "FlagProperty",
+    "column_flag",
+    "count_flags",
+    "flag_attributes",
+    "iter_flags",
+    "load_flags",
+    "now_scope",
+    "register_function",
+    "register_operator",
+    "rephrase_as_boolean",
+    "strict_loading",
+    "translate_flags",
+    "undefer_flags",
+    "use_clock",
+    "use_strict_loading",
+)
 
 
 def column_flag(
-    expr: ColumnElement[Any], default: Any = None, prefetch_attribute_names: bool = True
-) -> HybridPropertyType:
-    expression = Expression(rephrase_as_boolean(expr))
+    expr: Union[ColumnElement[Any], ColumnPropertyType],
+    default: Any = None,
+    prefetch_attribute_names: bool = True,
+    cache: bool = False,
+    lazy: bool = False,
+    preload: bool = False,
+) -> FlagProperty:
+    if isinstance(expr, ColumnProperty):  # A deferred() or column_property()
+        expr = expr.columns[0]
+    expression = Expression(rephrase_as_boolean(expr), lazy=lazy)
     derived = DerivedColumn(
-        expression, default=default, prefetch_attribute_names=prefetch_attribute_names
+        expression,
+        default=default,
+        prefetch_attribute_names=prefetch_attribute_names,
+        cache=cache,
+        lazy=lazy,
+        preload=preload,
     )
     return derived.create_hybrid()
@@ -0,0 +1,76 @@
+"""Per-instance memoization of flag values."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Optional, Set, Type
+
+from sqlalchemy.event import listen
+
+from .dispatch import mapper_configured
+from .resolver import mapped_attribute_names
+from .typing import ColumnSet, HybridGetterType, MapperType
+
+
+class FlagCache:
+    """Memoizes flag values on instances, invalidating them through ORM events.
+
+    The computed value is stored in the instance dictionary, making repeated
+    reads a single dictionary lookup. For every mapped class with the flag's
+    columns, listeners are registered that discard the stored value whenever
+    one of those columns is set, removed, expired or refreshed.
+    """
+
+    def __init__(self, columns: ColumnSet):
+        self._columns = columns
+        self.key = f"_flag_cache_{id(self)}"
+        mapper_configured.register(columns, self._instrument_mapper)
+
+    def memoize(self, getter: HybridGetterType[bool]) -> HybridGetterType[bool]:
+        """Returns a getter that computes the value once, until invalidated."""
+        key = self.key
+
+        def _getter(orm_obj: Any) -> bool:
+            instance_dict = orm_obj.__dict__
+            try:
+                return instance_dict[key]
+            except KeyError:
+                value = instance_dict[key] = getter(orm_obj)
+                return value
+
+        return _getter
+
+    def _instrument_mapper(self, mapper: MapperType, mapped_class: Type[Any]) -> None:
+        """Registers invalidation listeners for the flag's columns on the mapper."""
+        attribute_names = mapped_attribute_names(mapper)
+        names = {
+            attribute_names[col] for col in self._columns if col in attribute_names
+        }
+        if not names:
+            return
+        for name in names:
+            attribute = mapper.class_manager[name]
+            listen(attribute, "set", self._invalidate_on_change)
+            listen(attribute, "remove", self._invalidate_on_change)
+        invalidate_on_reload = self._reload_invalidator(names)
+        for event in ("expire", "refresh", "refresh_flush"):
+            listen(mapper, event, invalidate_on_reload)
+
+    def _invalidate(self, orm_obj: Any) -> None:
+        orm_obj.__dict__.pop(self.key, None)
+
+    def _invalidate_on_change(self, orm_obj: Any, *args: Any, **kwargs: Any) -> None:
+        self._invalidate(orm_obj)
+
+    def _reload_invalidator(self, names: Set[str]) -> Callable[..., None]:
+        """Returns a listener for the instance expire and refresh events.
+
+        These events pass the affected attribute names as their last argument,
+        or None when all attributes are affected.
+        """
+
+        def _listener(orm_obj: Any, *args: Any) -> None:
+            attrs: Optional[Iterable[str]] = args[-1]
+            if attrs is None or not names.isdisjoint(attrs):
+                self._invalidate(orm_obj)
+
+        return _listener
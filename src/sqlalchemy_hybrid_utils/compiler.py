@@ -0,0 +1,123 @@
+"""Compiles serialized Expression programs into native Python closures."""
+
+import operator
+from typing import Any, Callable, Dict, Iterable, List, MutableMapping, Sequence
+from weakref import WeakValueDictionary
+
+from .functions import all_of, any_of
+from .program import Program
+from .symbols import (
+    ColumnSymbol,
+    GroupingSymbol,
+    LiteralSymbol,
+    OperatorSymbol,
+    Symbol,
+)
+from .typing import ColumnReader, ColumnType, Evaluator, Function
+
+Reducer = Callable[[Iterable[Any]], bool]
+SHORT_CIRCUIT_OPERATORS: Dict[Function, Reducer] = {
+    operator.and_: all,
+    operator.or_: any,
+    all_of: all,
+    any_of: any,
+}
+
+
+_templates: MutableMapping[Any, Evaluator] = WeakValueDictionary()
+
+
+def read_column_values(column: ColumnType) -> Evaluator:
+    """Returns an evaluator reading the column from a ColumnValues function."""
+    return lambda values: values(column)
+
+
+def compile_template(program: Program) -> Evaluator:
+    """Compiles a program into a closure reading column values by slot number.
+
+    The resulting evaluator is called with a function that returns the value
+    for each slot (see `Program.slot_columns`), rather than for each column.
+    Compiled templates are interned by the structure of their program, so
+    that structurally identical programs on different columns, such as those
+    of flags declared by a mixin class, share a single compiled evaluator.
+    """
+    key: Any = program.structure
+    try:
+        return _templates[key]
+    except KeyError:
+        pass
+    except TypeError:  # Structures with unhashable literals are not interned
+        key = None
+    slots = {column: slot for slot, column in enumerate(program.slot_columns)}
+    template = compile_program(program, lambda column: _read_slot(slots[column]))
+    if key is not None:
+        _templates[key] = template
+    return template
+
+
+def compile_program(
+    program: Iterable[Symbol], read_column: ColumnReader = read_column_values
+) -> Evaluator:
+    """Compiles a serialized program into a single nested closure.
+
+    The program is walked once, with the stack holding evaluators rather than
+    values. Each symbol becomes a closure that calls the closures of its
+    operands directly, so evaluating the result involves no stack management
+    or per-symbol type dispatch.
+
+    Conjunctions and disjunctions evaluate their operands lazily, in the order
+    of the original clauses, stopping as soon as the outcome is decided. This
+    means columns are only read when they can affect the result.
+
+    How column values are obtained is determined by `read_column`, which
+    provides the evaluator for each column. By default, the compiled program
+    is evaluated with a ColumnValues function, like `Expression.evaluate()`.
+    """
+    stack: List[Evaluator] = []
+    for symbol in program:
+        if isinstance(symbol, LiteralSymbol):
+            stack.append(_literal(symbol.value))
+        elif isinstance(symbol, ColumnSymbol):
+            stack.append(read_column(symbol.column))
+        elif isinstance(symbol, OperatorSymbol):
+            operands = [stack.pop() for _ in range(symbol.arity)]
+            if reducer := SHORT_CIRCUIT_OPERATORS.get(symbol.operator):
+                stack.append(_short_circuit(reducer, operands[::-1]))
+            else:
+                stack.append(_operator(symbol.operator, operands))
+        elif isinstance(symbol, GroupingSymbol):
+            stack.append(_grouping([stack.pop() for _ in range(symbol.arity)]))
+        else:
+            raise RuntimeError(f"Bad Symbol type {symbol}")  # pragma: no cover
+    return stack.pop()
+
+
+def _read_slot(slot: int) -> Evaluator:
+    return lambda values: values(slot)
+
+
+def _grouping(operands: Sequence[Evaluator]) -> Evaluator:
+    return lambda values: [operand(values) for operand in operands]
+
+
+def _literal(value: Any) -> Evaluator:
+    return lambda values: value
+
+
+def _operator(operator: Function, operands: Sequence[Evaluator]) -> Evaluator:
+    if len(operands) == 1:
+        (operand,) = operands
+        return lambda values: operator(operand(values))
+    elif len(operands) == 2:
+        left, right = operands
+        return lambda values: operator(left(values), right(values))
+    return lambda values: operator(*(operand(values) for operand in operands))
+
+
+def _short_circuit(reducer: Reducer, operands: Sequence[Evaluator]) -> Evaluator:
+    if len(operands) == 2:
+        first, second = operands
+        if reducer is all:
+            return lambda values: bool(first(values) and second(values))
+        return lambda values: bool(first(values) or second(values))
+    return lambda values: reducer(operand(values) for operand in operands)
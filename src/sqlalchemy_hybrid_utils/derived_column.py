@@ -1,34 +1,124 @@
 from __future__ import annotations
 
-from typing import Any
+import warnings
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cached_property
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Type,
+    cast,
+)
+from weakref import WeakKeyDictionary
 
-from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy import update
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import Session, query_expression
 
+from .cache import FlagCache
+from .dispatch import before_configured, mapper_configured
 from .expression import Expression
+from .functions import now_scope
 from .resolver import AttributeResolver, PrefetchedAttributeResolver
+from .specialize import specialized_getter
 from .typing import (
     ColumnDefaults,
+    Evaluator,
     HybridGetterType,
     HybridPropertyType,
     HybridSetterType,
+    MapperType,
 )
 
+STRICT_LOADING_MODES = (None, "raise", "warn")
+
+_flag_keys: MutableMapping[MapperType, Dict[Any, str]] = WeakKeyDictionary()
+
 
 class DerivedColumn:
+    """Python and SQL evaluation of an Expression, as a hybrid property.
+
+    The resolver and cache depend on the columns of the expression, and are
+    set up when the DerivedColumn is created. When `lazy` is True, this is
+    deferred until mappers are next configured, and the getter is compiled
+    on first use. This avoids serializing expressions for flags that are
+    defined, but never used. When `preload` is True, an attribute to which
+    `load_flags` loads the flag's value is added to the mapped class.
+    """
+
     def __init__(
         self,
         expression: Expression,
         default: Any = None,
         prefetch_attribute_names: bool = True,
+        cache: bool = False,
+        lazy: bool = False,
+        preload: bool = False,
     ):
         self.expression = expression
         self.default = default
-        if not prefetch_attribute_names:
-            self.resolver = AttributeResolver(expression.columns)
+        self.lazy = lazy
+        self.preload = preload
+        self._preloaded_keys: MutableMapping[Type[Any], str] = WeakKeyDictionary()
+        self._prefetch_attribute_names = prefetch_attribute_names
+        self._use_cache = cache
+        if lazy:
+            before_configured.add(self._set_up)
         else:
-            self.resolver = PrefetchedAttributeResolver(expression.columns)
+            self._set_up()
+
+    def _set_up(self) -> None:
+        """Sets up the resolver and cache for the columns of the expression."""
         if len(self.expression.columns) > 1 and self.default is not None:
             raise TypeError("Cannot use default for multi-column expression.")
+        self.resolver  # Both register handlers for configured mappers
+        self.cache
+        if self.preload:
+            columns = self.expression.columns
+            mapper_configured.register(columns, self._declare_preloaded)
+
+    def _declare_preloaded(self, mapper: MapperType, mapped_class: Type[Any]) -> None:
+        """Declares the attribute that `load_flags` preloads the flag's value to.
+
+        The query expression attribute is added to the base-most mapper with the
+        flag, so that it is shared by the subclasses that inherit the flag.
+        """
+        for base in reversed(list(mapper.iterate_to_root())):
+            if (key := mapped_flag_keys(base).get(self)) is not None:
+                preloaded_key = f"_{key}_preloaded"
+                if not base.has_property(preloaded_key):
+                    base.add_property(preloaded_key, query_expression())
+                self._preloaded_keys[mapped_class] = preloaded_key
+                return
+
+    def preloaded_key(self, mapped_class: Type[Any]) -> str:
+        """Returns the attribute that the flag is preloaded to on the class."""
+        if not self.preload:
+            raise TypeError("Flag is not preloadable, create it with preload=True")
+        try:
+            return self._preloaded_keys[mapped_class]
+        except KeyError:
+            raise TypeError(f"Flag is not an attribute of {mapped_class.__name__}")
+
+    @cached_property
+    def resolver(self) -> AttributeResolver:
+        if not self._prefetch_attribute_names:
+            return AttributeResolver(self.expression.columns)
+        return PrefetchedAttributeResolver(self.expression.columns)
+
+    @cached_property
+    def cache(self) -> Optional[FlagCache]:
+        return FlagCache(self.expression.columns) if self._use_cache else None
 
     def _default_functions(self) -> ColumnDefaults:
         setter = self.default
@@ -36,27 +126,307 @@ class DerivedColumn:
             setter = lambda: self.default  # noqa
         return {True: setter, False: lambda: None}
 
+    def column_value(self, value: bool) -> Any:
+        """Returns the value the column is set to, to set the flag to value."""
+        return self._default_functions()[value]()
+
     def make_getter(self) -> HybridGetterType[bool]:
-        """Returns a getter function, evaluating the expression in bound scope."""
-        evaluate = self.expression.evaluate
-        values = self.resolver.values
-        return lambda orm_obj: evaluate(values(orm_obj))
+        """Returns a getter function, evaluating the expression in bound scope.
+
+        Where the resolver has prefetched attribute names, common expression
+        shapes are evaluated by a specialized getter instead. When caching is
+        enabled, the getter's result is memoized on the instance. For a lazy
+        DerivedColumn, the getter is created when the flag is first read.
+        """
+        if self.lazy:
+            return self._make_lazy_getter()
+        return self._make_getter()
+
+    def _make_lazy_getter(self) -> HybridGetterType[bool]:
+        getter: Optional[HybridGetterType[bool]] = None
+
+        def _getter(orm_obj: Any) -> bool:
+            nonlocal getter
+            if getter is None:
+                getter = self._make_getter()
+            return getter(orm_obj)
+
+        return _getter
+
+    def _make_getter(self) -> HybridGetterType[bool]:
+        getter = self._make_evaluating_getter()
+        if self.cache is not None:
+            getter = self.cache.memoize(getter)
+        return getter
+
+    def _make_evaluating_getter(self) -> HybridGetterType[bool]:
+        """Returns a getter reading the columns from the instance dictionary.
+
+        When any of the columns is not loaded, evaluation is left to
+        `_evaluate_unloaded`, so that objects with all columns loaded are not
+        affected by preloading and strict loading.
+        """
+        unloaded = self._evaluate_unloaded
+        if isinstance(self.resolver, PrefetchedAttributeResolver):
+            program = tuple(self.expression.optimized)
+            targets = self.resolver.targets
+            if getter := specialized_getter(program, targets, unloaded):
+                return getter
+        evaluate = self.expression.template
+        columns = self.expression.optimized.slot_columns
+        attribute_names = self.resolver.attribute_names
+
+        def _getter(orm_obj: Any) -> bool:
+            names = attribute_names(type(orm_obj))
+            instance_dict = orm_obj.__dict__
+            try:
+                return evaluate(lambda slot: instance_dict[names[columns[slot]]])
+            except KeyError:
+                return unloaded(orm_obj)
+
+        return _getter
+
+    def _evaluate_unloaded(self, orm_obj: Any) -> bool:
+        """Evaluates the flag on an object of which any column is not loaded.
+
+        A value preloaded by `load_flags` is used instead of loading the columns,
+        as long as none of the flag's loaded columns have been modified since.
+        Otherwise the columns are loaded as they are read, which warns or raises
+        with strict loading enabled. New objects are evaluated as they are.
+        """
+        names = self.resolver.attribute_names(type(orm_obj))
+        columns = self.expression.optimized.slot_columns
+        state = inspect(orm_obj)
+        if state.key is None:
+            return self.expression.template(
+                lambda slot: getattr(orm_obj, names[columns[slot]])
+            )
+        instance_dict = state.dict
+        preloaded_key = self._preloaded_keys.get(type(orm_obj))
+        if preloaded_key in instance_dict and state.committed_state.keys().isdisjoint(
+            names[column] for column in self.expression.columns
+        ):
+            return bool(instance_dict[preloaded_key])
+        mode = _scoped_strict_loading.get(_strict_loading)
+        lazy_loaded: List[str] = []
+
+        def values(slot: int) -> Any:
+            name = names[columns[slot]]
+            if name not in instance_dict and mode is not None:
+                if mode == "raise":
+                    raise InvalidRequestError(self._lazy_load_message(orm_obj, name))
+                lazy_loaded.append(name)
+            return getattr(orm_obj, name)
+
+        result = self.expression.template(values)
+        if lazy_loaded:
+            message = self._lazy_load_message(orm_obj, *lazy_loaded)
+            # Points at the flag's caller, past this method, the evaluating getter,
+            # the hybrid's __get__, and the caching and lazy getter wrappers.
+            stacklevel = 4 + (self.cache is not None) + self.lazy
+            warnings.warn(message, RuntimeWarning, stacklevel=stacklevel)
+        return result
+
+    def _lazy_load_message(self, orm_obj: Any, *names: str) -> str:
+        loaded = ", ".join(names)
+        return f"Flag {self.expression.sql} lazy loads {loaded} of {orm_obj!r}"
+
+    def evaluate_many(self, objects: Iterable[Any]) -> List[bool]:
+        """Evaluates the expression for each of the given ORM objects.
+
+        Objects are grouped by their class, so that attribute names are resolved
+        once for each mapped class rather than for every object. The results are
+        returned in the order of the given objects. The current time, as used by
+        `now()`, is read once for all objects.
+        """
+        with now_scope():
+            return self._evaluate_many(list(objects))
+
+    def _evaluate_many(self, objects: List[Any]) -> List[bool]:
+        results: List[bool] = [False] * len(objects)
+        indexes_by_class: Dict[Type[Any], List[int]] = defaultdict(list)
+        evaluate = self.expression.template
+        columns = self.expression.optimized.slot_columns
+        for index, orm_obj in enumerate(objects):
+            indexes_by_class[type(orm_obj)].append(index)
+        for mapped_class, indexes in indexes_by_class.items():
+            names = self.resolver.attribute_names(mapped_class)
+            slot_names = [names[column] for column in columns]
+            members = (objects[index] for index in indexes)
+            evaluations = _evaluate_each(evaluate, slot_names, members)
+            for index, result in zip(indexes, evaluations):
+                results[index] = result
+        return results
 
     def make_setter(self) -> HybridSetterType[bool]:
         """Returns a setter function setting default values based on given booleans."""
         defaults = self._default_functions()
-        target_name = self.resolver.single_name
+        derived = self
 
         def _fset(self: Any, value: Any) -> None:
             if not isinstance(value, bool):
                 raise TypeError("Flag only accepts boolean values")
-            setattr(self, target_name(self), defaults[value]())
+            setattr(self, derived.resolver.single_name(self), defaults[value]())
 
         return _fset
 
-    def create_hybrid(self) -> HybridPropertyType:
-        return hybrid_property(
+    def bulk_set(
+        self, session: Session, mapped_class: Type[Any], where: Any, value: bool
+    ) -> int:
+        """Sets the flag on all rows matching `where` with a single UPDATE.
+
+        The value to store is resolved once: a callable default is called, and
+        an SQL expression default (such as `func.now()`) is left for the UPDATE
+        to evaluate. The column is expired on the loaded instances of updated
+        rows, so that these load the updated value on next access. Databases
+        without UPDATE .. RETURNING do not report the updated rows, there the
+        column is expired on all loaded instances of the class instead.
+        Returns the number of updated rows.
+        """
+        if not isinstance(value, bool):
+            raise TypeError("Flag only accepts boolean values")
+        elif self.default is None:
+            raise TypeError("Cannot set flag without default.")
+        mapper = inspect(mapped_class)
+        if self not in mapped_flag_keys(mapper):
+            raise TypeError(f"Flag is not an attribute of {mapped_class.__name__}")
+        (column,) = self.expression.columns
+        name = self.resolver.attribute_names(mapped_class)[column]
+        statement = (
+            update(mapped_class)
+            .where(where)
+            .values({name: self.column_value(value)})
+            .execution_options(synchronize_session=False)
+        )
+        bind = session.get_bind(mapper)
+        if not getattr(bind.dialect, "update_returning", False):
+            result = cast("CursorResult[Any]", session.execute(statement))
+            for orm_obj in list(session.identity_map.values()):
+                if isinstance(orm_obj, mapped_class):
+                    session.expire(orm_obj, [name])
+            return result.rowcount
+        rows = session.execute(statement.returning(*mapper.primary_key)).all()
+        for row in rows:
+            key = mapper.identity_key_from_primary_key(tuple(row))
+            if (orm_obj := session.identity_map.get(key)) is not None:
+                session.expire(orm_obj, [name])
+        return len(rows)
+
+    def create_hybrid(self) -> FlagProperty:
+        return FlagProperty(
             fget=self.make_getter(),
             fset=self.make_setter() if self.default is not None else None,
             expr=lambda cls: self.expression.sql,
+            derived=self,
         )
+
+
+_strict_loading: Optional[str] = None
+_scoped_strict_loading: ContextVar[Optional[str]] = ContextVar("strict_loading")
+
+
+def use_strict_loading(mode: Optional[str]) -> None:
+    """Checks whether flag getters lazy load their columns, or stops checking.
+
+    With mode "warn", a RuntimeWarning is issued when a flag is evaluated on
+    a persistent object whose columns are not loaded, for example because they
+    were deferred or excluded with `load_only`. With mode "raise", this raises
+    InvalidRequestError instead. Flags preloaded by `load_flags` do not load.
+
+    This sets the mode for the whole process, `strict_loading` overrides it
+    for a single thread or task.
+    """
+    global _strict_loading
+    _check_strict_loading_mode(mode)
+    _strict_loading = mode
+
+
+@contextmanager
+def strict_loading(mode: Optional[str] = "raise") -> Iterator[None]:
+    """Sets the strict loading mode within the current context.
+
+    The mode is as for `use_strict_loading`, and is restored on exit. As it is
+    held in a context variable, other threads and tasks are not affected.
+    """
+    _check_strict_loading_mode(mode)
+    token = _scoped_strict_loading.set(mode)
+    try:
+        yield
+    finally:
+        _scoped_strict_loading.reset(token)
+
+
+def _check_strict_loading_mode(mode: Optional[str]) -> None:
+    if mode not in STRICT_LOADING_MODES:
+        raise ValueError(f"Unknown strict loading mode: {mode!r}")
+
+
+class FlagProperty(HybridPropertyType):
+    """Hybrid property for a derived column, providing additional operations.
+
+    These operations are available both on the hybrid itself, and through its
+    class-level attribute (e.g. `Message.is_sent.evaluate_many(messages)`).
+    """
+
+    def __init__(self, *args: Any, derived: DerivedColumn, **kwargs: Any):
+        # Hybrid modifiers (`setter`, `expression`) copy the property by passing
+        # its public attributes back to __init__, these are accepted here.
+        super().__init__(*args, **kwargs)
+        self.derived = derived
+
+    def bulk_set(
+        self, session: Session, mapped_class: Type[Any], where: Any, value: bool
+    ) -> int:
+        """Sets the flag on the rows of the class matching `where`, in one UPDATE.
+
+        The class is given explicitly, as a flag inherited by subclasses is the
+        same object for all of them. Given a subclass with single table
+        inheritance, only rows of that subclass are updated.
+        """
+        return self.derived.bulk_set(session, mapped_class, where, value)
+
+    def evaluate_many(self, objects: Iterable[Any]) -> List[bool]:
+        """Returns the flag value for each of the given ORM objects."""
+        return self.derived.evaluate_many(objects)
+
+    def row_evaluator(self, selected: Iterable[Any]) -> Evaluator:
+        """Returns a function evaluating the flag on rows of the selected columns."""
+        return self.derived.expression.row_evaluator(selected)
+
+
+def mapped_flag_keys(mapper: MapperType) -> Dict[DerivedColumn, str]:
+    """Returns the attribute key of each flag of the given mapper.
+
+    Like the attribute names of columns, this is created once for each mapper
+    and shared by all flags of the mapped class.
+    """
+    try:
+        return _flag_keys[mapper]
+    except KeyError:
+        keys = _flag_keys[mapper] = {
+            descriptor.derived: key
+            for key, descriptor in mapper.all_orm_descriptors.items()
+            if isinstance(descriptor, FlagProperty)
+        }
+        return keys
+
+
+def get_derived_column(flag: Any) -> DerivedColumn:
+    """Returns the DerivedColumn of a flag, given as hybrid or class attribute."""
+    try:
+        derived = flag.derived
+    except AttributeError:
+        derived = None
+    if not isinstance(derived, DerivedColumn):
+        raise TypeError(f"Not a column flag: {flag!r}")
+    return derived
+
+
+def _evaluate_each(
+    evaluate: Evaluator, slot_names: Sequence[str], objects: Iterable[Any]
+) -> List[Any]:
+    """Evaluates the template on same-class objects, binding each explicitly."""
+    return [
+        evaluate(lambda slot, orm_obj=orm_obj: getattr(orm_obj, slot_names[slot]))
+        for orm_obj in objects
+    ]
@@ -0,0 +1,122 @@
+"""Shared dispatching of mapper configuration events, indexed by table."""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+from weakref import WeakKeyDictionary, WeakMethod, ref
+
+from sqlalchemy.event import listen
+from sqlalchemy.orm import Mapper
+
+from .typing import ColumnSet, MapperType
+
+MapperHandler = Callable[[MapperType, Type[Any]], None]
+HandlerRef = Callable[[], Optional[MapperHandler]]
+Callback = Callable[[], None]
+F = TypeVar("F", bound=Callable[..., None])
+
+
+class MapperConfiguredDispatcher:
+    """Calls handlers for configured mappers that map any of their tables.
+
+    A single `mapper_configured` listener serves all registered handlers. Each
+    handler is registered along with the columns it concerns, and is only
+    called for mappers of the tables those columns belong to. This keeps the
+    cost of mapper configuration linear in the number of mappers and handlers.
+
+    Columns declared in a declarative class body are not yet attached to their
+    table when the handler is registered. Handlers are therefore kept pending,
+    and indexed by table when the next mapper is configured.
+
+    Both tables and handlers are referenced weakly. A handler that is a bound
+    method is detached once its owner is collected, so that registering does
+    not keep flags, or the mapped classes they resolve, alive.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: MutableMapping[Any, List[HandlerRef]] = WeakKeyDictionary()
+        self._pending: List[Tuple[ColumnSet, HandlerRef]] = []
+        self._listening = False
+
+    def register(self, columns: ColumnSet, handler: MapperHandler) -> None:
+        """Registers a handler for mappers that map any of the given columns."""
+        self._pending.append((columns, _weak_handler(handler)))
+        if not self._listening:
+            listen(Mapper, "mapper_configured", self.dispatch)
+            self._listening = True
+
+    def dispatch(self, mapper: MapperType, mapped_class: Type[Any]) -> None:
+        """Calls the handlers registered for any of the mapper's tables, once."""
+        if self._pending:
+            self._index_pending()
+        handlers: Dict[MapperHandler, None] = {}
+        for table in mapper.tables:
+            if references := self._handlers.get(table):
+                handlers.update(dict.fromkeys(_live_handlers(references)))
+        for handler in handlers:
+            handler(mapper, mapped_class)
+
+    def _index_pending(self) -> None:
+        pending, self._pending = self._pending, []
+        for columns, reference in pending:
+            if reference() is None:
+                continue
+            tables = {column.table for column in columns}
+            if None in tables:
+                self._pending.append((columns, reference))
+                continue
+            for table in tables:
+                self._handlers.setdefault(table, []).append(reference)
+
+
+class BeforeConfiguredQueue:
+    """Calls queued callbacks once, before mappers are next configured.
+
+    This allows work that is only needed for configured mappers to be deferred
+    past class creation, while still completing before `mapper_configured`
+    events are dispatched. Like handlers, callbacks are referenced weakly.
+    """
+
+    def __init__(self) -> None:
+        self._callbacks: List[Callable[[], Optional[Callback]]] = []
+        self._listening = False
+
+    def add(self, callback: Callback) -> None:
+        """Queues a callback to be called before mappers are next configured."""
+        self._callbacks.append(_weak_handler(callback))
+        if not self._listening:
+            listen(Mapper, "before_configured", self.dispatch)
+            self._listening = True
+
+    def dispatch(self) -> None:
+        """Calls and dequeues all queued callbacks that are still alive."""
+        callbacks, self._callbacks = self._callbacks, []
+        for reference in callbacks:
+            if callback := reference():
+                callback()
+
+
+def _live_handlers(references: List[HandlerRef]) -> List[MapperHandler]:
+    """Returns the handlers that are alive, discarding references to dead ones."""
+    handlers = [handler for reference in references if (handler := reference())]
+    if len(handlers) < len(references):
+        references[:] = [reference for reference in references if reference()]
+    return handlers
+
+
+def _weak_handler(handler: F) -> Callable[[], Optional[F]]:
+    if hasattr(handler, "__self__"):
+        return WeakMethod(handler)
+    return ref(handler)
+
+
+before_configured = BeforeConfiguredQueue()
+mapper_configured = MapperConfiguredDispatcher()
@@ -2,9 +2,19 @@ from __future__ import annotations
 
 import operator
 from collections import deque
-from dataclasses import dataclass
+from functools import cached_property
 from itertools import chain
-from typing import Any, Deque, Iterator, Set
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Sequence,
+    Set,
+)
 
 from sqlalchemy.sql import operators
 from sqlalchemy.sql.elements import (
@@ -12,6 +22,7 @@ from sqlalchemy.sql.elements import (
     BinaryExpression,
     BindParameter,
     BooleanClauseList,
+    Case,
     ClauseElement,
     ClauseList,
     ColumnElement,
@@ -19,18 +30,43 @@ from sqlalchemy.sql.elements import (
     Null,
     UnaryExpression,
 )
+from sqlalchemy.sql.functions import FunctionElement
 from sqlalchemy.sql.schema import Column
 from sqlalchemy.sql.sqltypes import Boolean
 
-from .typing import ColumnSet, ColumnValues, Function, FunctionMap
+from .compiler import compile_program, compile_template
+from .functions import (
+    SQL_FUNCTIONS,
+    all_of,
+    any_of,
+    case_value,
+    case_when,
+    is_in,
+    operator_implementation,
+)
+from .optimizer import optimize
+from .program import COLUMN, GROUPING, LITERAL, OPERATOR, Program
+from .resolver import RowResolver
+from .symbols import (
+    ColumnSymbol,
+    GroupingSymbol,
+    LiteralSymbol,
+    OperatorSymbol,
+    Symbol,
+)
+from .typing import ColumnSet, ColumnValues, Evaluator, Function, FunctionMap
+
+if TYPE_CHECKING:
+    from .vectorized import BoolArray
 
 BOOLEAN_MULTICLAUSE_OPERATORS: FunctionMap = {
-    operator.and_: lambda *args: all(args),
-    operator.or_: lambda *args: any(args),
+    operator.and_: all_of,
+    operator.or_: any_of,
 }
+BETWEEN_OPERATORS: Set[Function] = {operators.between_op, operators.notbetween_op}
 NIL_OPERATORS: Set[Function] = {operators.istrue}
 OPERATOR_MAP: FunctionMap = {
-    operators.in_op: lambda left, right: left in right,
+    operators.in_op: is_in,
     operators.is_: operator.eq,
     operators.isnot: operator.ne,
     operators.isfalse: operator.not_,
@@ -43,53 +79,125 @@ class Expression:
     A given SQLAlchemy expression is converted into an internal serialized
     format that allows runtime Python execution based on substitute values for
     the columns involved in the expression. The method to use for this is
-    `.evaluate()`.
+    `.evaluate()`, which runs a program compiled to nested Python closures.
+    The stack-based interpreter the program was originally designed for is
+    retained as a reference implementation, available through `.interpret()`.
+
+    Before compilation, the program is rewritten by a series of optimizer
+    passes. The program as serialized from the SQLAlchemy expression and its
+    optimized form are available as `serialized` and `optimized` respectively.
+    Both are stored as compact Programs, which also determine the equality
+    and hash of the Expression.
 
     When `forrce_bool` is True, bare columns and inverted columns (~Column) are
     converted to booleans. In this operating mode, a column value is False when
     it is None (equivalent `IS NULL`) and True otherwise. In this operating
     mode, the given expression itself is also modified with these same semantics
     and stored on the `sql` attribute.
+
+    When `lazy` is True, the expression is not serialized and compiled until
+    the program is first needed. Unsupported expressions are then reported
+    only at that point, rather than when the Expression is created.
+
+    Otherwise the shared template, which the flag getters use, is compiled on
+    creation. The evaluator specific to the expression, used by `.evaluate()`,
+    is compiled on first use. This way, flags with the same structure compile
+    and keep only a single template, while `.evaluate()` is only compiled for
+    the expressions that call it, at the cost of a slower first call.
     """
 
-    def __init__(self, expression: ColumnElement[Any]):
-        self.serialized = tuple(self._serialize(expression))
+    def __init__(self, expression: ColumnElement[Any], lazy: bool = False):
         self.sql = expression
+        if not lazy:
+            self.template  # Serializes, optimizes and compiles the expression
+
+    @cached_property
+    def serialized(self) -> Program:
+        """Returns the program as serialized from the SQLAlchemy expression."""
+        return Program.from_symbols(self._serialize(self.sql))
+
+    @cached_property
+    def optimized(self) -> Program:
+        """Returns the serialized program as rewritten by the optimizer."""
+        return Program.from_symbols(optimize(self.serialized))
+
+    @cached_property
+    def template(self) -> Evaluator:
+        """Returns the optimized program compiled to nested Python closures.
+
+        The template reads column values by slot number, and is shared with
+        all expressions that have the same structure (see `compile_template`).
+        """
+        return compile_template(self.optimized)
+
+    @cached_property
+    def compiled(self) -> Evaluator:
+        """Returns the optimized program compiled to read the columns directly.
+
+        Unlike the template, this evaluator is specific to the expression, so
+        that column values are read without the indirection of slot numbers.
+        """
+        return compile_program(self.optimized)
 
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, type(self)):
             return NotImplemented
         return self.serialized == other.serialized
 
+    def __hash__(self) -> int:
+        return hash(self.serialized)
+
     def evaluate(self, column_values: ColumnValues) -> Any:
         """Evaluates the SQLAlchemy expression on the current column values."""
+        return self.compiled(column_values)
+
+    def evaluate_arrays(self, arrays: Mapping[Any, Any]) -> BoolArray:
+        """Evaluates the expression on arrays of column values, one per row.
+
+        The arrays are given as a mapping of column (or column name) to an array
+        or any array-like sequence, such as the columns of a pandas DataFrame.
+        Evaluation is vectorized using NumPy, which must be installed for this.
+        """
+        from .vectorized import evaluate_arrays
+
+        return evaluate_arrays(self.optimized, self.columns, arrays)
+
+    def row_evaluator(self, selected: Iterable[Any]) -> Evaluator:
+        """Returns an evaluator for result rows containing the selected columns.
+
+        The returned function takes a row (or any other sequence) of values, in
+        the order of the given selection, and evaluates the expression on them.
+        """
+        resolver = RowResolver(self.columns, selected)
+        return compile_program(self.optimized, resolver.read_column)
+
+    def interpret(self, column_values: ColumnValues) -> Any:
+        """Evaluates the expression by running the serialized program on a stack."""
         stack: Deque[Any] = deque()
         stack_push = stack.append
         stack_pop = stack.pop
-        for symbol in self.serialized:
-            if isinstance(symbol, LiteralSymbol):
-                stack_push(symbol.value)
-            elif isinstance(symbol, ColumnSymbol):
-                stack_push(column_values(symbol.column))
-            elif isinstance(symbol, OperatorSymbol):
-                arity = symbol.arity
+        for opcode, operand, arity in self.serialized.instructions():
+            if opcode == LITERAL:
+                stack_push(operand)
+            elif opcode == COLUMN:
+                stack_push(column_values(operand))
+            elif opcode == OPERATOR:
                 if arity == 1:
-                    stack_push(symbol.operator(stack_pop()))
+                    stack_push(operand(stack_pop()))
                 elif arity == 2:
-                    stack_push(symbol.operator(stack_pop(), stack_pop()))
+                    stack_push(operand(stack_pop(), stack_pop()))
                 else:
-                    stack_push(symbol.operator(*(stack_pop() for _ in range(arity))))
-            elif isinstance(symbol, GroupingSymbol):
-                stack_push([stack_pop() for _ in range(symbol.arity)])
+                    stack_push(operand(*(stack_pop() for _ in range(arity))))
+            elif opcode == GROUPING:
+                stack_push([stack_pop() for _ in range(arity)])
             else:
-                raise RuntimeError(f"Bad Symbol type {symbol}")  # pragma: no cover
+                raise RuntimeError(f"Bad opcode {opcode}")  # pragma: no cover
         return stack_pop()
 
-    @property
+    @cached_property
     def columns(self) -> ColumnSet:
         """Returns a set of columns used in the expression."""
-        symbols = self.serialized
-        return {symbol.column for symbol in symbols if isinstance(symbol, ColumnSymbol)}
+        return self.serialized.columns
 
     def _serialize(self, expr: ClauseElement) -> Iterator[Symbol]:
         """Serializes an SQLAlchemy expression to Python functions.
@@ -101,10 +209,21 @@ class Expression:
         """
         # Simple and direct value types
         if isinstance(expr, BindParameter):
-            yield LiteralSymbol(expr.value)
-        elif isinstance(expr, Grouping) and isinstance(expr.element, ClauseList):
-            yield from chain.from_iterable(map(self._serialize, expr.element))
-            yield GroupingSymbol(len(expr.element))
+            if expr.expanding:  # The list of values for IN, in SQLAlchemy 1.4+
+                if expr.value is None:
+                    raise TypeError(f"Expanding parameter {expr.key!r} has no value")
+                yield LiteralSymbol(tuple(expr.value))
+            else:
+                yield LiteralSymbol(expr.value)
+        elif isinstance(expr, Grouping):
+            element = expr.element
+            if isinstance(element, BooleanClauseList) or not isinstance(
+                element, ClauseList
+            ):
+                yield from self._serialize(element)  # Parenthesized sub-expression
+            else:
+                yield from chain.from_iterable(map(self._serialize, element))
+                yield GroupingSymbol(len(element))
         elif isinstance(expr, Null):
             yield LiteralSymbol(None)
         # Columns and column-wrapping functions
@@ -117,15 +236,37 @@ class Expression:
         elif isinstance(expr, UnaryExpression):
             yield from self._serialize(expr.element)
             assert expr.operator is not None  # TODO: Find breaking case for this
-            yield OperatorSymbol(expr.operator, arity=1)
+            if expr.operator is operator.inv and _is_boolean(expr.element):
+                yield OperatorSymbol(operator.not_, arity=1)
+            else:
+                yield OperatorSymbol(expr.operator, arity=1)
         # Multi-clause expressions
         elif isinstance(expr, BinaryExpression):
-            if isinstance(expr.operator, operators.custom_op):
-                raise TypeError(f"Unsupported operator {expr.operator}")
-            yield from self._serialize(expr.right)
-            yield from self._serialize(expr.left)
-            operator = OPERATOR_MAP.get(expr.operator, expr.operator)
-            yield OperatorSymbol(operator, arity=2)
+            if (function := operator_implementation(expr.operator)) is None:
+                if isinstance(expr.operator, operators.custom_op):
+                    raise TypeError(f"Unsupported operator {expr.operator}")
+                function = OPERATOR_MAP.get(expr.operator, expr.operator)
+            arguments: List[Any] = [expr.left]
+            if expr.operator in BETWEEN_OPERATORS:
+                arguments.extend(expr.right.clauses)
+                if expr.modifiers.get("symmetric"):
+                    arguments.append(True)
+            else:
+                arguments.append(expr.right)
+            if (escape := expr.modifiers.get("escape")) is not None:
+                arguments.append(escape)
+            yield from self._serialize_call(function, arguments)
+        elif isinstance(expr, FunctionElement) and (
+            function := SQL_FUNCTIONS.get(getattr(expr, "name", "").lower())
+        ):
+            yield from self._serialize_call(function, expr.clauses.clauses)
+        elif isinstance(expr, Case):
+            arguments = [] if expr.value is None else [expr.value]
+            for condition, result in expr.whens:
+                arguments.extend((condition, result))
+            arguments.append(expr.else_)
+            function = case_when if expr.value is None else case_value
+            yield from self._serialize_call(function, arguments)
         elif isinstance(expr, BooleanClauseList):
             yield from chain.from_iterable(map(self._serialize, expr.clauses))
             if (arity := len(expr.clauses)) == 0:
@@ -133,50 +274,36 @@ class Expression:
             elif arity == 2:
                 yield OperatorSymbol(expr.operator, arity=arity)
             else:
-                operator = BOOLEAN_MULTICLAUSE_OPERATORS[expr.operator]
-                yield OperatorSymbol(operator, arity)
+                function = BOOLEAN_MULTICLAUSE_OPERATORS[expr.operator]
+                yield OperatorSymbol(function, arity)
         else:
             expr_type = type(expr).__name__
             raise TypeError(f"Unsupported expression {expr} of type {expr_type}")
 
+    def _serialize_call(
+        self, function: Function, arguments: Sequence[Any]
+    ) -> Iterator[Symbol]:
+        """Serializes a call of function with the given arguments.
 
-class Symbol:
-    """Base class for Symbols created and used by the Expression class."""
-
-
-@dataclass(frozen=True)
-class ColumnSymbol(Symbol):
-    column: Column[Any]
-
-    def __post_init__(self) -> None:
-        if not isinstance(self.column, Column):
-            raise TypeError(f"Value must be column-like: {self.column}")
-
-
-@dataclass(frozen=True)
-class GroupingSymbol(Symbol):
-    arity: int
-
-    def __post_init__(self) -> None:
-        if not isinstance(self.arity, int):
-            raise TypeError(f"Arity must be an integer: {self.arity}")
-
-
-@dataclass(frozen=True)
-class LiteralSymbol(Symbol):
-    value: Any
-
+        Arguments are serialized in reverse, as the first argument to the call
+        is the last one to be taken from the stack. Arguments that are not SQL
+        expressions, such as the escape character of LIKE, are literals.
+        """
+        for argument in reversed(arguments):
+            if isinstance(argument, ClauseElement):
+                yield from self._serialize(argument)
+            else:
+                yield LiteralSymbol(argument)
+        yield OperatorSymbol(function, arity=len(arguments))
 
-@dataclass(frozen=True)
-class OperatorSymbol(Symbol):
-    operator: Function
-    arity: int
 
-    def __post_init__(self) -> None:
-        if not callable(self.operator):
-            raise TypeError(f"Operator must be callable: {self.operator}")
-        if not isinstance(self.arity, int):
-            raise TypeError(f"Arity must be an integer: {self.arity}")
+def _is_boolean(expr: ClauseElement) -> bool:
+    """Returns whether the expression results in a boolean value."""
+    while isinstance(expr, Grouping):
+        expr = expr.element
+    if isinstance(expr, UnaryExpression) and expr.operator is operator.inv:
+        return _is_boolean(expr.element)
+    return isinstance(getattr(expr, "type", None), Boolean)
 
 
 def rephrase_as_boolean(expr: ColumnElement[Any]) -> ColumnElement[bool]:
@@ -0,0 +1,292 @@
+"""Python implementations of operators used in serialized programs.
+
+Besides the operators the serializer uses internally, this provides a registry
+of Python implementations for SQL functions (by name) and operators. These are
+used to evaluate expressions that use them in Python. Implementations follow
+SQL semantics for NULL: when a NULL (None) argument makes the result unknown,
+they return None.
+
+The current time, for `now()` and `current_timestamp`, is read from the clock
+once per scope (see `now_scope`), so that all evaluations within the scope
+agree on the same instant. The clock defaults to naive UTC, matching SQLite's
+CURRENT_TIMESTAMP, and can be replaced to match other databases (`use_clock`).
+"""
+
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, Optional, Pattern, Union
+
+from sqlalchemy.sql import operators
+
+from .typing import Function
+
+SQL_FUNCTIONS: Dict[str, Function] = {}
+SQL_OPERATORS: Dict[Any, Function] = {}
+
+_scoped_now: ContextVar[Optional[datetime]] = ContextVar("now", default=None)
+
+
+def register_function(name: str, implementation: Function) -> None:
+    """Registers the Python implementation of an SQL function, by its name.
+
+    The implementation is called with the function's arguments, in order. The
+    name is case-insensitive, as function names are in SQL.
+    """
+    SQL_FUNCTIONS[name.lower()] = implementation
+
+
+def register_operator(operator: Union[str, Function], implementation: Function) -> None:
+    """Registers the Python implementation of an SQL operator.
+
+    Operators are given as the operator function from `sqlalchemy.operators`,
+    or as the operator string for custom operators created with `.op()`. The
+    implementation is called with the left and right operands.
+    """
+    SQL_OPERATORS[operator] = implementation
+
+
+def operator_implementation(operator: Any) -> Optional[Function]:
+    """Returns the registered implementation for the given SQL operator."""
+    if isinstance(operator, operators.custom_op):
+        return SQL_OPERATORS.get(operator.opstring)
+    return SQL_OPERATORS.get(operator)
+
+
+def all_of(*args: Any) -> bool:
+    """Returns whether all of the given multi-clause arguments are truthy."""
+    return all(args)
+
+
+def any_of(*args: Any) -> bool:
+    """Returns whether any of the given multi-clause arguments is truthy."""
+    return any(args)
+
+
+def is_in(left: Any, right: Any) -> bool:
+    """Returns whether the left operand is contained in the right (IN)."""
+    return left in right
+
+
+def case_when(*args: Any) -> Any:
+    """Returns the result of the first true condition (CASE WHEN ... THEN).
+
+    Arguments are pairs of condition and result, followed by the ELSE result.
+    """
+    *whens, else_ = args
+    for index in range(0, len(whens), 2):
+        if whens[index]:
+            return whens[index + 1]
+    return else_
+
+
+def case_value(value: Any, *args: Any) -> Any:
+    """Returns the result of the first match for value (CASE value WHEN ...).
+
+    Arguments are pairs of compared value and result, followed by the ELSE
+    result. A NULL value matches none of the compared values.
+    """
+    *whens, else_ = args
+    if value is not None:
+        for index in range(0, len(whens), 2):
+            if whens[index] == value:
+                return whens[index + 1]
+    return else_
+
+
+def between(value: Any, lower: Any, upper: Any, symmetric: bool = False) -> Any:
+    """Returns whether value is between lower and upper, inclusive (BETWEEN)."""
+    if value is None or lower is None or upper is None:
+        return None
+    if symmetric and lower > upper:
+        lower, upper = upper, lower
+    return bool(lower <= value <= upper)
+
+
+def not_between(value: Any, lower: Any, upper: Any, symmetric: bool = False) -> Any:
+    """Returns whether value is outside of lower and upper (NOT BETWEEN)."""
+    result = between(value, lower, upper, symmetric)
+    return None if result is None else not result
+
+
+def like(value: Any, pattern: Any, escape: Optional[str] = None) -> Any:
+    """Returns whether value matches the LIKE pattern."""
+    if value is None or pattern is None:
+        return None
+    return like_regex(pattern, escape, False).match(value) is not None
+
+
+def ilike(value: Any, pattern: Any, escape: Optional[str] = None) -> Any:
+    """Returns whether value matches the LIKE pattern, ignoring case (ILIKE)."""
+    if value is None or pattern is None:
+        return None
+    return like_regex(pattern, escape, True).match(value) is not None
+
+
+def not_like(value: Any, pattern: Any, escape: Optional[str] = None) -> Any:
+    """Returns whether value does not match the LIKE pattern (NOT LIKE)."""
+    result = like(value, pattern, escape)
+    return None if result is None else not result
+
+
+def not_ilike(value: Any, pattern: Any, escape: Optional[str] = None) -> Any:
+    """Returns whether value does not match the pattern, ignoring case."""
+    result = ilike(value, pattern, escape)
+    return None if result is None else not result
+
+
+def affixed_like(match: Function, prefix: str, suffix: str) -> Function:
+    """Returns an implementation of LIKE with affixes added to the pattern.
+
+    This implements `startswith`, `endswith` and `contains`, which SQL renders
+    as LIKE against the operand concatenated with `%` wildcards.
+    """
+
+    def implementation(value: Any, operand: Any, escape: Optional[str] = None) -> Any:
+        pattern = None if operand is None else prefix + operand + suffix
+        return match(value, pattern, escape)
+
+    return implementation
+
+
+@lru_cache(maxsize=1024)
+def like_regex(pattern: str, escape: Optional[str], ignore_case: bool) -> Pattern[str]:
+    """Returns a compiled regular expression equivalent to the LIKE pattern.
+
+    In LIKE patterns, `%` matches any sequence of characters, and `_` matches
+    any single character. Preceded by the escape character, these match
+    themselves. Compiled expressions are cached by pattern.
+    """
+    parts = []
+    characters = iter(pattern)
+    for char in characters:
+        if char == escape:
+            parts.append(re.escape(next(characters, "")))
+        elif char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    flags = re.DOTALL | (re.IGNORECASE if ignore_case else 0)
+    return re.compile("".join(parts) + r"\Z", flags)
+
+
+def coalesce(*args: Any) -> Any:
+    """Returns the first argument that is not NULL (COALESCE)."""
+    return next((arg for arg in args if arg is not None), None)
+
+
+def concat(left: Any, right: Any) -> Any:
+    """Returns the concatenation of two strings (||)."""
+    if left is None or right is None:
+        return None
+    return left + right
+
+
+def length(value: Any) -> Any:
+    """Returns the number of characters in the string (LENGTH)."""
+    return None if value is None else len(value)
+
+
+def lower(value: Any) -> Any:
+    """Returns the string in lower case (LOWER)."""
+    return None if value is None else value.lower()
+
+
+def upper(value: Any) -> Any:
+    """Returns the string in upper case (UPPER)."""
+    return None if value is None else value.upper()
+
+
+def absolute(value: Any) -> Any:
+    """Returns the absolute value of a number (ABS)."""
+    return None if value is None else abs(value)
+
+
+def utc_now() -> datetime:
+    """Returns the current UTC time, as a naive datetime (the default clock)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+_clock: Callable[[], datetime] = utc_now
+
+
+def use_clock(clock: Callable[[], datetime]) -> None:
+    """Sets the clock that is read for the current time, `utc_now` by default.
+
+    The clock should agree with the database's time for the compared columns.
+    SQLite stores CURRENT_TIMESTAMP in UTC, which the default matches. For a
+    database using local time, use `datetime.now`, and for columns with time
+    zones, a clock returning aware datetimes.
+    """
+    global _clock
+    _clock = clock
+
+
+def current_timestamp() -> datetime:
+    """Returns the current time (NOW, CURRENT_TIMESTAMP).
+
+    Within a `now_scope`, this is the time fixed for the scope. Outside of one,
+    the clock is read on every call.
+    """
+    scoped = _scoped_now.get()
+    return _clock() if scoped is None else scoped
+
+
+@contextmanager
+def now_scope(
+    timestamp: Optional[datetime] = None,
+    clock: Optional[Callable[[], datetime]] = None,
+) -> Iterator[datetime]:
+    """Fixes the time that `now()` evaluates to, for the duration of the block.
+
+    The time is the given timestamp, or else the current time, read once when
+    entering the scope from the given clock, or the one set with `use_clock`.
+    Nested scopes without a timestamp keep the time of the enclosing scope, so
+    that a scope can be opened per request, and evaluation of a batch within
+    it uses the request's time.
+    """
+    if (now := timestamp or _scoped_now.get()) is None:
+        now = (clock or _clock)()
+    token = _scoped_now.set(now)
+    try:
+        yield now
+    finally:
+        _scoped_now.reset(token)
+
+
+register_function("abs", absolute)
+register_function("char_length", length)
+register_function("coalesce", coalesce)
+register_function("current_timestamp", current_timestamp)
+register_function("length", length)
+register_function("lower", lower)
+register_function("now", current_timestamp)
+register_function("upper", upper)
+register_operator(operators.between_op, between)
+register_operator(operators.notbetween_op, not_between)
+register_operator(operators.concat_op, concat)
+register_operator(operators.like_op, like)
+register_operator(operators.ilike_op, ilike)
+register_operator(operators.notlike_op, not_like)
+register_operator(operators.notilike_op, not_ilike)
+# Operators of older SQLAlchemy versions are named without the underscore, and
+# case-insensitive ones are new in SQLAlchemy 2.0.
+for name, prefix, suffix in [
+    ("startswith", "", "%"),
+    ("endswith", "%", ""),
+    ("contains", "%", "%"),
+]:
+    for variant, match in [
+        ("", like),
+        ("not", not_like),
+        ("not_", not_like),
+        ("i", ilike),
+        ("not_i", not_ilike),
+    ]:
+        operator = getattr(operators, f"{variant}{name}_op", None)
+        if operator is not None:  # pragma: no branch
+            register_operator(operator, affixed_like(match, prefix, suffix))
@@ -0,0 +1,197 @@
+"""Rewrites serialized Expression programs into shorter, equivalent programs."""
+
+from __future__ import annotations
+
+import operator
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Sequence, Tuple
+
+from .functions import all_of, any_of, is_in
+from .symbols import GroupingSymbol, LiteralSymbol, OperatorSymbol, Symbol
+from .typing import FunctionMap
+
+BOOLEAN_OPERATORS = {
+    operator.and_,
+    operator.or_,
+    operator.not_,
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.le,
+    operator.gt,
+    operator.ge,
+    all_of,
+    any_of,
+    bool,
+}
+CONJUNCTIONS = {operator.and_, all_of}
+DISJUNCTIONS = {operator.or_, any_of}
+NEGATED_COMPARISONS: FunctionMap = {operator.eq: operator.ne, operator.ne: operator.eq}
+
+
+class Node(NamedTuple):
+    """A symbol along with its operands, in the order they appear in a program."""
+
+    symbol: Symbol
+    operands: Tuple[Node, ...] = ()
+
+    @property
+    def operator(self) -> Any:
+        return getattr(self.symbol, "operator", None)
+
+    @property
+    def is_literal(self) -> bool:
+        return isinstance(self.symbol, LiteralSymbol)
+
+    @property
+    def value(self) -> Any:
+        assert isinstance(self.symbol, LiteralSymbol)
+        return self.symbol.value
+
+
+Rewrite = Callable[[Node], Node]
+
+
+def fold_constants(node: Node) -> Node:
+    """Replaces operators and groupings of only literals by their result."""
+    if not node.operands or not all(operand.is_literal for operand in node.operands):
+        return node
+    arguments = [operand.value for operand in reversed(node.operands)]
+    if isinstance(node.symbol, GroupingSymbol):
+        return Node(LiteralSymbol(arguments))
+    try:
+        return Node(LiteralSymbol(node.operator(*arguments)))
+    except Exception:
+        return node  # Leaves the error to surface during evaluation
+
+
+def flatten_associative(node: Node) -> Node:
+    """Merges nested conjunctions (or disjunctions) into a single operator."""
+    for family in (CONJUNCTIONS, DISJUNCTIONS):
+        if node.operator in family:
+            operands: List[Node] = []
+            for operand in node.operands:
+                if operand.operator in family:
+                    operands.extend(operand.operands)
+                else:
+                    operands.append(operand)
+            return _multiclause(node.operator in CONJUNCTIONS, operands)
+    return node
+
+
+def remove_double_negation(node: Node) -> Node:
+    """Removes pairs of negations and pushes negation into (in)equalities."""
+    if node.operator is operator.not_:
+        (operand,) = node.operands
+        if operand.operator is operator.not_:
+            return _truth(operand.operands[0])
+        elif operand.operator is bool:
+            return node._replace(operands=operand.operands)
+        elif negated := NEGATED_COMPARISONS.get(operand.operator):
+            return Node(OperatorSymbol(negated, arity=2), operand.operands)
+    return node
+
+
+def eliminate_dead_branches(node: Node) -> Node:
+    """Drops literal operands from conjunctions and disjunctions.
+
+    A literal that decides the outcome (False for AND, True for OR) replaces
+    the whole clause, the remaining literals have no effect and are removed.
+    """
+    for family, deciding_value in ((CONJUNCTIONS, False), (DISJUNCTIONS, True)):
+        if node.operator in family:
+            operands = []
+            for operand in node.operands:
+                if not operand.is_literal:
+                    operands.append(operand)
+                elif bool(operand.value) is deciding_value:
+                    return Node(LiteralSymbol(deciding_value))
+            return _multiclause(not deciding_value, operands)
+    return node
+
+
+def freeze_membership_tests(node: Node) -> Node:
+    """Replaces literal value lists on the right hand side of IN by a frozenset.
+
+    This makes the membership test a hash lookup, rather than a scan of the
+    list. Lists with unhashable values are left as they are.
+    """
+    if node.operator is is_in:
+        values, element = node.operands
+        if values.is_literal and isinstance(values.value, (list, tuple)):
+            try:
+                literal = LiteralSymbol(frozenset(values.value))
+            except TypeError:
+                return node
+            return node._replace(operands=(Node(literal), element))
+    return node
+
+
+def remove_redundant_truth(node: Node) -> Node:
+    """Removes truth tests of operations that already result in a boolean."""
+    if node.operator is bool and node.operands[0].operator in BOOLEAN_OPERATORS:
+        return node.operands[0]
+    return node
+
+
+PASSES: Sequence[Rewrite] = (
+    fold_constants,
+    remove_double_negation,
+    flatten_associative,
+    eliminate_dead_branches,
+    freeze_membership_tests,
+    remove_redundant_truth,
+)
+
+
+def optimize(
+    program: Iterable[Symbol], passes: Sequence[Rewrite] = PASSES
+) -> Tuple[Symbol, ...]:
+    """Returns an optimized, equivalent version of the given program.
+
+    The program is converted to a tree, which is rewritten bottom-up. Each of
+    the passes is applied in turn to every node, after its operands have been
+    fully optimized. The resulting tree is serialized into a new program.
+    """
+    return tuple(_serialize(_rewrite(_parse(program), passes)))
+
+
+def _multiclause(conjunction: bool, operands: Sequence[Node]) -> Node:
+    if not operands:
+        return Node(LiteralSymbol(conjunction))
+    elif len(operands) == 1:
+        return _truth(operands[0])
+    elif len(operands) == 2:
+        function = operator.and_ if conjunction else operator.or_
+    else:
+        function = all_of if conjunction else any_of
+    return Node(OperatorSymbol(function, arity=len(operands)), tuple(operands))
+
+
+def _parse(program: Iterable[Symbol]) -> Node:
+    stack: List[Node] = []
+    for symbol in program:
+        if isinstance(symbol, (GroupingSymbol, OperatorSymbol)):
+            operands = tuple(stack[len(stack) - symbol.arity :])
+            del stack[len(stack) - symbol.arity :]
+            stack.append(Node(symbol, operands))
+        else:
+            stack.append(Node(symbol))
+    return stack.pop()
+
+
+def _rewrite(node: Node, passes: Sequence[Rewrite]) -> Node:
+    operands = tuple(_rewrite(operand, passes) for operand in node.operands)
+    node = node._replace(operands=operands)
+    for rewrite in passes:
+        node = rewrite(node)
+    return node
+
+
+def _serialize(node: Node) -> Iterator[Symbol]:
+    for operand in node.operands:
+        yield from _serialize(operand)
+    yield node.symbol
+
+
+def _truth(node: Node) -> Node:
+    return remove_redundant_truth(Node(OperatorSymbol(bool, arity=1), (node,)))
@@ -0,0 +1,145 @@
+"""Compact representation of the serialized program of an Expression."""
+
+from __future__ import annotations
+
+from array import array
+from itertools import count
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy.sql.schema import Column
+
+from .symbols import ColumnSymbol, GroupingSymbol, LiteralSymbol, OperatorSymbol, Symbol
+from .typing import ColumnSet, ColumnType
+
+# Opcodes, each instruction consists of an opcode, a constant index and an arity
+LITERAL = 0
+COLUMN = 1
+OPERATOR = 2
+GROUPING = 3
+
+
+class Program:
+    """A serialized program, stored as an array of instructions and constants.
+
+    Every instruction takes up three consecutive integers in the code array:
+    the opcode, the index of its operand in the constant pool, and its arity.
+    The constant pool holds the literal values, columns and operator functions
+    of the program, with equal values stored only once.
+
+    Programs are sequences of Symbols, which are created when accessed. Two
+    programs are equal when both their code and constants are, and programs
+    whose literal values are all hashable can be hashed.
+    """
+
+    __slots__ = ("code", "constants")
+
+    def __init__(self, code: array[int], constants: Tuple[Any, ...]):
+        self.code = code
+        self.constants = constants
+
+    @classmethod
+    def from_symbols(cls, symbols: Iterable[Symbol]) -> Program:
+        """Returns the compact program for the given sequence of Symbols."""
+        code = array("H")
+        constants: List[Any] = []
+        indexes: Dict[Any, int] = {}
+
+        def constant_index(value: Any) -> int:
+            try:
+                key = type(value), value
+                if (index := indexes.get(key)) is None:
+                    index = indexes[key] = len(constants)
+                    constants.append(value)
+                return index
+            except TypeError:  # Unhashable values are not deduplicated
+                constants.append(value)
+                return len(constants) - 1
+
+        for symbol in symbols:
+            if isinstance(symbol, LiteralSymbol):
+                code.extend((LITERAL, constant_index(symbol.value), 0))
+            elif isinstance(symbol, ColumnSymbol):
+                code.extend((COLUMN, constant_index(symbol.column), 0))
+            elif isinstance(symbol, OperatorSymbol):
+                index = constant_index(symbol.operator)
+                code.extend((OPERATOR, index, symbol.arity))
+            elif isinstance(symbol, GroupingSymbol):
+                code.extend((GROUPING, 0, symbol.arity))
+            else:
+                raise RuntimeError(f"Bad Symbol type {symbol}")  # pragma: no cover
+        return cls(code, tuple(constants))
+
+    @property
+    def columns(self) -> ColumnSet:
+        """Returns a set of the columns used in the program."""
+        code, constants = self.code, self.constants
+        return {
+            constants[code[offset + 1]]
+            for offset in range(0, len(code), 3)
+            if code[offset] == COLUMN
+        }
+
+    @property
+    def slot_columns(self) -> Tuple[ColumnType, ...]:
+        """Returns the columns of the program, ordered by their slot number.
+
+        Columns are numbered in the order of their first use in the program.
+        """
+        return tuple(value for value in self.constants if isinstance(value, Column))
+
+    @property
+    def structure(self) -> Tuple[bytes, Tuple[Any, ...]]:
+        """Returns the structure of the program, without its concrete columns.
+
+        In the structure, columns are replaced by their slot number. Programs
+        that apply the same operations to different columns, in the same way,
+        have equal structures. As with programs themselves, the structure can
+        only be hashed when all literal values are hashable.
+        """
+        slots = count()
+        constants = tuple(
+            next(slots) if isinstance(value, Column) else (type(value), value)
+            for value in self.constants
+        )
+        return self.code.tobytes(), constants
+
+    def instructions(self) -> Iterator[Tuple[int, Any, int]]:
+        """Yields the opcode, operand and arity of every instruction."""
+        for offset in range(0, len(self.code), 3):
+            yield self._instruction(offset)
+
+    def _instruction(self, offset: int) -> Tuple[int, Any, int]:
+        opcode, index, arity = self.code[offset : offset + 3]
+        operand = self.constants[index] if opcode != GROUPING else None
+        return opcode, operand, arity
+
+    def __iter__(self) -> Iterator[Symbol]:
+        for instruction in self.instructions():
+            yield _symbol(*instruction)
+
+    def __len__(self) -> int:
+        return len(self.code) // 3
+
+    def __getitem__(self, index: int) -> Symbol:
+        return _symbol(*self._instruction(range(0, len(self.code), 3)[index]))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Program):
+            return NotImplemented
+        return self.code == other.code and self.constants == other.constants
+
+    def __hash__(self) -> int:
+        return hash((self.code.tobytes(), self.constants))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+
+def _symbol(opcode: int, operand: Any, arity: int) -> Symbol:
+    if opcode == LITERAL:
+        return LiteralSymbol(operand)
+    elif opcode == COLUMN:
+        return ColumnSymbol(operand)
+    elif opcode == OPERATOR:
+        return OperatorSymbol(operand, arity)
+    return GroupingSymbol(arity)
@@ -0,0 +1,210 @@
+"""Query helpers operating on column flags without loading ORM instances."""
+
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+from sqlalchemy import case, func, select
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import Load, Session, configure_mappers
+
+from .derived_column import DerivedColumn, get_derived_column, mapped_flag_keys
+from .functions import now_scope
+from .typing import ColumnType, Evaluator
+
+
+def iter_flags(
+    session: Session, mapped_class: Type[Any], *flags: Any, batch_size: int = 1000
+) -> Iterator[Tuple[Any, ...]]:
+    """Yields the primary key and values of the given flags for every row.
+
+    Only the primary key and the columns the flags depend on are selected, and
+    results are streamed from the database in batches of `batch_size` rows.
+    Each flag is evaluated directly on the result rows, without creating ORM
+    instances, and the current time used by `now()` is read once per batch.
+    The primary key is yielded as a single value, or as a tuple of values for
+    mapped classes with a composite primary key.
+    """
+    mapper = inspect(mapped_class)
+    derived_columns = [get_derived_column(flag) for flag in flags]
+    primary_key = list(mapper.primary_key)
+    columns: Dict[ColumnType, None] = dict.fromkeys(primary_key)
+    for derived in derived_columns:
+        columns.update(dict.fromkeys(derived.expression.columns))
+    attributes = [
+        getattr(mapped_class, mapper.get_property_by_column(column).key)
+        for column in columns
+    ]
+    statement = select(*attributes).execution_options(
+        stream_results=True, yield_per=batch_size
+    )
+    evaluators = [
+        derived.expression.row_evaluator(statement.selected_columns)
+        for derived in derived_columns
+    ]
+    key_size = len(primary_key)
+    for partition in session.execute(statement).partitions():
+        with now_scope():
+            results = [_row_flags(row, key_size, evaluators) for row in partition]
+        yield from results
+
+
+def _row_flags(
+    row: Sequence[Any], key_size: int, evaluators: Sequence[Evaluator]
+) -> Tuple[Any, ...]:
+    key: Any = row[0] if key_size == 1 else tuple(row[:key_size])
+    values: List[Any] = [evaluate(row) for evaluate in evaluators]
+    return (key, *values)
+
+
+def count_flags(
+    session: Session,
+    mapped_class: Type[Any],
+    flags: Sequence[Any],
+    group_by: Any = None,
+) -> Union[Tuple[int, ...], Dict[Any, Tuple[int, ...]]]:
+    """Returns the number of rows for which each of the given flags is true.
+
+    All flags are counted in a single query, as a sum of `CASE WHEN <flag>
+    THEN 1 ELSE 0 END` for each flag. The counts are returned in the order of
+    the given flags. When `group_by` is given (a column or attribute), the
+    counts are returned for each of its values, in a dictionary keyed by value.
+    """
+    for flag in flags:
+        get_derived_column(flag)  # Rejects attributes that are not flags
+    counts = [func.sum(case((flag, 1), else_=0)) for flag in flags]
+    if group_by is None:
+        statement = select(*counts).select_from(mapped_class)
+        return _counts(session.execute(statement).one())
+    statement = select(group_by, *counts).select_from(mapped_class).group_by(group_by)
+    return {row[0]: _counts(row[1:]) for row in session.execute(statement)}
+
+
+def _counts(sums: Sequence[Optional[int]]) -> Tuple[int, ...]:
+    """Returns the summed flags as integers, the sum of no rows being NULL."""
+    return tuple(int(value or 0) for value in sums)
+
+
+def load_flags(*flags: Any) -> Load:
+    """Returns a loader option that loads the values of the given flags.
+
+    Each flag's SQL expression is selected along with the mapped class, much
+    like `with_expression`, and its result is stored on the loaded instances.
+    While any of a flag's columns are not loaded, for example because they are
+    deferred, the flag returns the loaded value rather than loading them:
+
+        select(Message).options(defer(Message.content), load_flags(Message.has_content))
+
+    The flags must be created with `preload=True`, which adds the attribute that
+    holds the loaded value, and be given as attributes of the queried class.
+    """
+    mapped_class = _mapped_class(flags)
+    configure_mappers()  # Declares the attributes the flags are preloaded to
+    option = Load(mapped_class)
+    for flag in flags:
+        derived = get_derived_column(flag)
+        attribute = getattr(mapped_class, derived.preloaded_key(mapped_class))
+        option = option.with_expression(attribute, derived.expression.sql)
+    return option
+
+
+def flag_attributes(*flags: Any) -> List[Any]:
+    """Returns the mapped attributes of the columns the given flags depend on.
+
+    These can be passed to `load_only`, so that the flags can be evaluated
+    without loading the excluded columns one object at a time:
+
+        select(Message).options(load_only(*flag_attributes(Message.is_sent)))
+
+    The flags must be given as attributes of the class that is queried.
+    """
+    mapped_class = _mapped_class(flags)
+    attributes: Dict[str, Any] = {}
+    for flag in flags:
+        derived = get_derived_column(flag)
+        names = derived.resolver.attribute_names(mapped_class)
+        for name in sorted(names[column] for column in derived.expression.columns):
+            attributes.setdefault(name, getattr(mapped_class, name))
+    return list(attributes.values())
+
+
+def undefer_flags(*flags: Any) -> Load:
+    """Returns a loader option that undefers the columns of the given flags.
+
+    The flags must be given as attributes of the class that is queried.
+    """
+    option = Load(_mapped_class(flags))
+    for attribute in flag_attributes(*flags):
+        option = option.undefer(attribute)
+    return option
+
+
+def translate_flags(
+    mapped_class: Type[Any],
+    mappings: Iterable[Mapping[str, Any]],
+    column_keys: bool = False,
+) -> List[Dict[str, Any]]:
+    """Returns the mappings with flag values replaced by their column values.
+
+    This allows flags to be given in the mappings for bulk inserts and updates
+    (`bulk_insert_mappings`, ORM bulk INSERT and the like), which bypass the
+    flag setters. A true flag sets its column to the flag's default, a false
+    one sets it to None. Defaults are resolved once for all mappings, so that
+    a callable default is called once, rather than for every row.
+
+    Mappings are keyed by attribute name, or by column key when `column_keys`
+    is True, for use with Core `insert(table).values(...)`. SQL expression
+    defaults (such as `func.now()`) are included as is. These can be used in
+    `insert(...).values(...)`, but not in executemany-style bulk operations.
+    """
+    flag_keys = mapped_flag_keys(inspect(mapped_class))
+    flags = {key: derived for derived, key in flag_keys.items()}
+    targets: Dict[str, Tuple[str, Dict[bool, Any]]] = {}
+    translated = []
+    for mapping in mappings:
+        mapping = dict(mapping)
+        for key in flags.keys() & mapping.keys():
+            if key not in targets:
+                targets[key] = _flag_target(flags[key], mapped_class, column_keys)
+            name, values = targets[key]
+            if name in mapping:
+                raise ValueError(f"Both flag {key} and its column {name} given")
+            value = mapping.pop(key)
+            if not isinstance(value, bool):
+                raise TypeError("Flag only accepts boolean values")
+            mapping[name] = values[value]
+        translated.append(mapping)
+    return translated
+
+
+def _flag_target(
+    derived: DerivedColumn, mapped_class: Type[Any], column_keys: bool
+) -> Tuple[str, Dict[bool, Any]]:
+    """Returns the mapping key of the flag's column, and its value by flag value."""
+    if derived.default is None:
+        raise TypeError("Cannot set flag without default.")
+    (column,) = derived.expression.columns
+    name = derived.resolver.attribute_names(mapped_class)[column]
+    values = {value: derived.column_value(value) for value in (True, False)}
+    return (column.key if column_keys else name), values
+
+
+def _mapped_class(flags: Sequence[Any]) -> Type[Any]:
+    """Returns the mapped class of the first flag, given as class attribute."""
+    if not flags:
+        raise TypeError("At least one flag is required")
+    try:
+        mapped_class: Type[Any] = flags[0].class_
+    except AttributeError:
+        raise TypeError(f"Flag must be given as class attribute: {flags[0]!r}")
+    return mapped_class
@@ -1,43 +1,99 @@
-from collections import defaultdict
-from typing import Any, Dict, Type
+from operator import itemgetter
+from typing import Any, Dict, Iterable, MutableMapping, Type, cast
+from weakref import WeakKeyDictionary
 
-from sqlalchemy.event import listen
 from sqlalchemy.inspection import inspect
-from sqlalchemy.orm import Mapper
 
-from .compat import column_presence_checker
-from .typing import ColumnSet, ColumnValues, MapperTargets, MapperType
+from .dispatch import mapper_configured
+from .typing import (
+    ColumnSet,
+    ColumnType,
+    ColumnValues,
+    Evaluator,
+    MapperTargets,
+    MapperType,
+)
+
+_column_keys: MutableMapping[MapperType, Dict[ColumnType, str]] = WeakKeyDictionary()
+
+
+def mapped_attribute_names(mapper: MapperType) -> Dict[ColumnType, str]:
+    """Returns the attribute name of each column mapped by the given mapper.
+
+    The mapping is created once for each mapper and shared by all its users,
+    so that a mapped class with many flags holds only a single copy of it.
+    """
+    try:
+        return _column_keys[mapper]
+    except KeyError:
+        names = _column_keys[mapper] = {
+            cast(ColumnType, column): prop.key
+            for prop in mapper.column_attrs
+            for column in prop.columns
+        }
+        return names
 
 
 class AttributeResolver:
-    """A runtime inspection-based resolver for attribute names and values."""
+    """A runtime inspection-based resolver for attribute names and values.
+
+    Attribute names are looked up on first use for each mapped class, and kept
+    until the class is collected or its mapper is (re)configured. This makes the
+    resolver independent of whether the mapper was configured before or after
+    the resolver was created.
+    """
 
     def __init__(self, columns: ColumnSet):
         self._columns = columns
         if len(self._columns) == 1:
             self._single = next(iter(columns))
+        self._names: MapperTargets = WeakKeyDictionary()
+        mapper_configured.register(columns, self._discard_attribute_names)
+
+    def _discard_attribute_names(
+        self, mapper: MapperType, mapped_class: Type[Any]
+    ) -> None:
+        """Discards attribute names looked up before the mapper was configured."""
+        self._names.pop(mapped_class, None)
+
+    def attribute_names(self, mapped_class: Type[Any]) -> Dict[ColumnType, str]:
+        """Returns the attribute name of each column for the given mapped class."""
+        try:
+            return self._names[mapped_class]
+        except KeyError:
+            mapper = inspect(mapped_class)
+            names = self._names[mapped_class] = {
+                col: mapper.get_property_by_column(col).key for col in self._columns
+            }
+            return names
 
     def single_name(self, orm_obj: Any) -> str:
         """Returns the first (and only) attribute name for __fset__."""
-        mapper = inspect(orm_obj).mapper
         try:
-            return mapper.get_property_by_column(self._single).key
+            return self.attribute_names(type(orm_obj))[self._single]
         except AttributeError:
             raise ValueError("Resolver contains multiple columns.")
 
     def values(self, orm_obj: Any) -> ColumnValues:
         """Returns values of column-attributes for given ORM object."""
-        mapper = inspect(orm_obj).mapper
-        getter = mapper.get_property_by_column
-        return lambda col: getattr(orm_obj, getter(col).key)
+        names = self.attribute_names(type(orm_obj))
+        return lambda col: getattr(orm_obj, names[col])
 
 
 class PrefetchedAttributeResolver(AttributeResolver):
+    """A resolver using attribute names looked up when mappers are configured.
+
+    The attribute names are stored per mapped class, referencing the classes
+    weakly. This allows dynamically created mapped classes to be collected.
+    All resolvers for a mapped class share the same attribute name mapping.
+    """
+
     def __init__(self, columns: ColumnSet):
-        super().__init__(columns)
-        self._singles: Dict[Type[Any], str] = {}
-        self._targets: MapperTargets = defaultdict(dict)
-        listen(Mapper, "mapper_configured", self._resolve_mapped_attribute_names)
+        self._columns = columns
+        if len(self._columns) == 1:
+            self._single = next(iter(columns))
+        self._targets: MapperTargets = WeakKeyDictionary()
+        mapper_configured.register(columns, self._resolve_mapped_attribute_names)
 
     def _resolve_mapped_attribute_names(
         self, mapper: MapperType, mapped_class: Type[Any]
@@ -48,21 +104,52 @@ class PrefetchedAttributeResolver(AttributeResolver):
         mapped class. This allows multiple mapped classes against the same
         table to have different attribute names to refer to a column.
         """
-        column_present = column_presence_checker(mapper.columns)
-        for column in self._columns:
-            if column_present(column):
-                attr = mapper.get_property_by_column(column)
-                if len(self._columns) == 1:
-                    self._singles[mapped_class] = attr.key
-                self._targets[mapped_class][column] = attr.key
+        names = mapped_attribute_names(mapper)
+        if not names.keys().isdisjoint(self._columns):
+            self._targets[mapped_class] = names
+
+    def attribute_names(self, mapped_class: Type[Any]) -> Dict[ColumnType, str]:
+        """Returns the attribute name of each column for the given mapped class.
+
+        This is the mapping shared by all resolvers for the class, and includes
+        the attribute names of columns other than the resolver's own.
+        """
+        return self._targets.get(mapped_class, {})
+
+    @property
+    def targets(self) -> MapperTargets:
+        """Returns the attribute name of each column, keyed by mapped class."""
+        return self._targets
 
     def single_name(self, orm_obj: Any) -> str:
         """Returns the first (and only) attribute name for __fset__."""
         try:
-            return self._singles[type(orm_obj)]
-        except KeyError:
+            return self._targets[type(orm_obj)][self._single]
+        except (AttributeError, KeyError):
             raise ValueError("Resolver contains multiple columns.")
 
     def values(self, orm_obj: Any) -> ColumnValues:
         targets = self._targets[type(orm_obj)]
         return lambda col: getattr(orm_obj, targets[col])
+
+
+class RowResolver:
+    """Resolves column values from result rows, by their position in the row.
+
+    The positions are determined once, from the columns selected by the query
+    (e.g. `select(...).selected_columns`). Values are then read from each row
+    by index, without requiring ORM instances.
+    """
+
+    def __init__(self, columns: ColumnSet, selected: Iterable[Any]):
+        positions: Dict[Any, int] = {}
+        for index, element in enumerate(selected):
+            positions.setdefault(element, index)
+        if missing := [column for column in columns if column not in positions]:
+            names = ", ".join(sorted(str(column) for column in missing))
+            raise ValueError(f"Columns not present in selection: {names}")
+        self.positions = {column: positions[column] for column in columns}
+
+    def read_column(self, column: ColumnType) -> Evaluator:
+        """Returns an evaluator reading the column's value from a result row."""
+        return itemgetter(self.positions[column])
@@ -0,0 +1,104 @@
+"""Specialized getters for the most common shapes of flag expressions."""
+
+from __future__ import annotations
+
+import operator
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .functions import all_of, any_of
+from .symbols import ColumnSymbol, LiteralSymbol, OperatorSymbol, Symbol
+from .typing import ColumnType, HybridGetterType, MapperTargets
+
+NullCheck = Tuple[ColumnType, bool]
+
+# Maps comparison operators against NULL to whether the check is for NULL
+NULL_CHECK_OPERATORS: Dict[Any, bool] = {operator.eq: True, operator.ne: False}
+# Maps multi-clause operators to the check outcome that decides their result
+DECIDING_OUTCOMES: Dict[Any, bool] = {
+    operator.and_: False,
+    all_of: False,
+    operator.or_: True,
+    any_of: True,
+}
+
+
+def specialized_getter(
+    program: Sequence[Symbol],
+    targets: MapperTargets,
+    unloaded: HybridGetterType[bool],
+) -> Optional[HybridGetterType[bool]]:
+    """Returns a getter specialized for the shape of the program, if possible.
+
+    Programs consisting of a single `IS [NOT] NULL` check on a column, or a
+    conjunction or disjunction of such checks, are evaluated by getters that
+    read values straight from the instance dictionary. Only when an attribute
+    is not loaded does the getter fall back to `unloaded`, which evaluates the
+    flag for the instance instead. For any other program shape, None is
+    returned.
+    """
+    if len(program) == 3 and (checks := _null_checks(program)):
+        return _single_check_getter(targets, unloaded, *checks[0])
+    last = program[-1]
+    if isinstance(last, OperatorSymbol) and last.operator in DECIDING_OUTCOMES:
+        checks = _null_checks(program[:-1])
+        if checks and len(checks) == last.arity:
+            deciding = DECIDING_OUTCOMES[last.operator]
+            return _multi_check_getter(targets, unloaded, checks, deciding)
+    return None
+
+
+def _null_checks(program: Sequence[Symbol]) -> Optional[List[NullCheck]]:
+    """Returns the column and NULL check of each of the program's clauses."""
+    if len(program) % 3:
+        return None
+    checks = []
+    for index in range(0, len(program), 3):
+        literal, column, check = program[index : index + 3]
+        if not (
+            isinstance(literal, LiteralSymbol)
+            and literal.value is None
+            and isinstance(column, ColumnSymbol)
+            and isinstance(check, OperatorSymbol)
+            and check.operator in NULL_CHECK_OPERATORS
+        ):
+            return None
+        checks.append((column.column, NULL_CHECK_OPERATORS[check.operator]))
+    return checks
+
+
+def _single_check_getter(
+    targets: MapperTargets,
+    unloaded: HybridGetterType[bool],
+    column: ColumnType,
+    is_null: bool,
+) -> HybridGetterType[bool]:
+    def _getter(orm_obj: Any) -> bool:
+        key = targets[type(orm_obj)][column]
+        try:
+            value = orm_obj.__dict__[key]
+        except KeyError:
+            return unloaded(orm_obj)
+        return (value is None) is is_null
+
+    return _getter
+
+
+def _multi_check_getter(
+    targets: MapperTargets,
+    unloaded: HybridGetterType[bool],
+    checks: Sequence[NullCheck],
+    deciding: bool,
+) -> HybridGetterType[bool]:
+    def _getter(orm_obj: Any) -> bool:
+        keys = targets[type(orm_obj)]
+        instance_dict = orm_obj.__dict__
+        for column, is_null in checks:
+            try:
+                value = instance_dict[keys[column]]
+            except KeyError:
+                return unloaded(orm_obj)
+            if ((value is None) is is_null) is deciding:
+                return deciding
+        return not deciding
+
+    return _getter
@@ -0,0 +1,53 @@
+"""Symbols making up the serialized program of an Expression."""
+
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.sql.schema import Column
+
+from .typing import Function
+
+
+class Symbol:
+    """Base class for Symbols created and used by the Expression class."""
+
+    __slots__ = ()
+
+
+@dataclass(frozen=True)
+class ColumnSymbol(Symbol):
+    __slots__ = ("column",)
+    column: Column[Any]
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.column, Column):
+            raise TypeError(f"Value must be column-like: {self.column}")
+
+
+@dataclass(frozen=True)
+class GroupingSymbol(Symbol):
+    __slots__ = ("arity",)
+    arity: int
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.arity, int):
+            raise TypeError(f"Arity must be an integer: {self.arity}")
+
+
+@dataclass(frozen=True)
+class LiteralSymbol(Symbol):
+    __slots__ = ("value",)
+    value: Any
+
+
+@dataclass(frozen=True)
+class OperatorSymbol(Symbol):
+    __slots__ = ("operator", "arity")
+    operator: Function
+    arity: int
+
+    def __post_init__(self) -> None:
+        if not callable(self.operator):
+            raise TypeError(f"Operator must be callable: {self.operator}")
+        if not isinstance(self.arity, int):
+            raise TypeError(f"Arity must be an integer: {self.arity}")
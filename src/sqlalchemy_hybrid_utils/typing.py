@@ -1,7 +1,7 @@
-from typing import TYPE_CHECKING, Any, Callable, Dict, Set, Type
+from typing import TYPE_CHECKING, Any, Callable, Dict, MutableMapping, Set, Type
 
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy.orm import Mapper
+from sqlalchemy.orm import ColumnProperty, Mapper
 from sqlalchemy.sql.schema import Column
 
 try:
@@ -16,24 +16,30 @@ except ImportError:
 # Types that are not yet generics in SQLAlchemy 1.3 and 1.4 need special treatment
 if TYPE_CHECKING:
     ColumnType = Column[Any]
+    ColumnPropertyType = ColumnProperty[Any]
     HybridPropertyType = hybrid_property[bool]
     MapperType = Mapper[Any]
 else:
     ColumnType = Column
+    ColumnPropertyType = ColumnProperty
     HybridPropertyType = hybrid_property
     MapperType = Mapper
 
 ColumnDefaults = Dict[bool, Any]
 ColumnValues = Callable[[ColumnType], Any]
 ColumnSet = Set[ColumnType]
+Evaluator = Callable[[Any], Any]
+ColumnReader = Callable[[ColumnType], Evaluator]
 Function = Callable[..., Any]
 FunctionMap = Dict[Function, Function]
-MapperTargets = Dict[Type[Any], Dict[ColumnType, str]]
+MapperTargets = MutableMapping[Type[Any], Dict[ColumnType, str]]
 
 __all__ = (
     "ColumnDefaults",
+    "ColumnReader",
     "ColumnSet",
     "ColumnValues",
+    "Evaluator",
     "Function",
     "FunctionMap",
     "HybridGetterType",
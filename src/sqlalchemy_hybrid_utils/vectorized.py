@@ -0,0 +1,148 @@
+"""Vectorized evaluation of Expression programs over columnar data.
+
+This module requires NumPy, which is an optional dependency. It is imported
+only when an expression is evaluated against arrays.
+"""
+
+from __future__ import annotations
+
+import operator
+from typing import Any, Callable, Dict, Iterable, List, Mapping
+
+import numpy
+from numpy.typing import NDArray
+
+from .functions import all_of, any_of, is_in
+from .symbols import (
+    ColumnSymbol,
+    GroupingSymbol,
+    LiteralSymbol,
+    OperatorSymbol,
+    Symbol,
+)
+from .typing import ColumnSet, ColumnType, Function
+
+BoolArray = NDArray[numpy.bool_]
+IS_NULL_OBJECT = numpy.frompyfunc(lambda value: value is None or value != value, 1, 1)
+ARITHMETIC_OPERATORS = {
+    operator.add,
+    operator.sub,
+    operator.mul,
+    operator.truediv,
+    operator.floordiv,
+    operator.mod,
+    operator.neg,
+    operator.inv,
+}
+COMPARISON_OPERATORS = {
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.le,
+    operator.gt,
+    operator.ge,
+}
+LOGICAL_OPERATORS: Dict[Function, Callable[[List[BoolArray]], BoolArray]] = {
+    operator.and_: numpy.logical_and.reduce,
+    operator.or_: numpy.logical_or.reduce,
+    all_of: numpy.logical_and.reduce,
+    any_of: numpy.logical_or.reduce,
+    operator.not_: lambda operands: numpy.logical_not(operands[0]),
+    bool: lambda operands: operands[0],
+}
+
+
+class Group(List[Any]):
+    """Operands of a grouping, as used on the right hand side of IN."""
+
+
+def evaluate_arrays(
+    program: Iterable[Symbol], columns: ColumnSet, arrays: Mapping[Any, Any]
+) -> BoolArray:
+    """Evaluates the program for all rows of the given columnar data at once.
+
+    The arrays are looked up by column, or by column name if the column itself
+    is not present. This allows a pandas DataFrame to be passed directly.
+
+    Comparisons involving NULL values (None, NaN or NaT) result in False, as
+    they would when used as an SQL WHERE clause. `IS [NOT] NULL` checks are
+    evaluated as a null mask of their column. SQL functions and operators that
+    have no array implementation, such as LIKE, raise TypeError.
+    """
+    inputs = {column: numpy.asarray(_lookup(arrays, column)) for column in columns}
+    shape = numpy.broadcast(*inputs.values()).shape if inputs else ()
+    stack: List[Any] = []
+    for symbol in program:
+        if isinstance(symbol, LiteralSymbol):
+            stack.append(symbol.value)
+        elif isinstance(symbol, ColumnSymbol):
+            stack.append(inputs[symbol.column])
+        elif isinstance(symbol, OperatorSymbol):
+            operands = [stack.pop() for _ in range(symbol.arity)]
+            stack.append(_apply(symbol.operator, operands))
+        elif isinstance(symbol, GroupingSymbol):
+            stack.append(Group(stack.pop() for _ in range(symbol.arity)))
+        else:
+            raise RuntimeError(f"Bad Symbol type {symbol}")  # pragma: no cover
+    return numpy.array(numpy.broadcast_to(stack.pop(), shape), dtype=bool)
+
+
+def null_mask(values: Any) -> BoolArray:
+    """Returns a boolean array that is True where values are NULL."""
+    values = numpy.asarray(values)
+    kind = values.dtype.kind
+    if kind in "fc":
+        return numpy.isnan(values)
+    elif kind in "mM":
+        return numpy.isnat(values)
+    elif kind == "O":
+        return numpy.array(IS_NULL_OBJECT(values), dtype=bool)
+    return numpy.zeros(values.shape, dtype=bool)
+
+
+def _apply(function: Function, operands: List[Any]) -> Any:
+    if logical := LOGICAL_OPERATORS.get(function):
+        return logical([_truth(operand) for operand in operands])
+    elif function in COMPARISON_OPERATORS:
+        return _compare(function, *operands)
+    elif function is is_in:
+        return _is_in(*operands)
+    elif function in ARITHMETIC_OPERATORS:
+        return function(*operands)
+    name = getattr(function, "__name__", function)
+    raise TypeError(f"{name} is not supported for array evaluation")
+
+
+def _compare(function: Function, left: Any, right: Any) -> BoolArray:
+    if left is None or right is None:
+        mask = null_mask(right if left is None else left)
+        return numpy.logical_not(mask) if function is operator.ne else mask
+    left, right = numpy.broadcast_arrays(left, right)
+    valid = numpy.logical_not(null_mask(left) | null_mask(right))
+    result = numpy.zeros(left.shape, dtype=bool)
+    result[valid] = function(left[valid], right[valid])
+    return result
+
+
+def _is_in(left: Any, right: Any) -> BoolArray:
+    if isinstance(right, Group):
+        matches = [_compare(operator.eq, left, operand) for operand in right]
+        return numpy.logical_or.reduce(matches)
+    left = numpy.asarray(left)
+    valid = numpy.logical_not(null_mask(left))
+    result = numpy.zeros(left.shape, dtype=bool)
+    result[valid] = numpy.isin(left[valid], list(right))
+    return result
+
+
+def _lookup(arrays: Mapping[Any, Any], column: ColumnType) -> Any:
+    if column in arrays:
+        return arrays[column]
+    return arrays[column.name]
+
+
+def _truth(values: Any) -> BoolArray:
+    values = numpy.asarray(values)
+    if values.dtype.kind == "b":
+        return values
+    return numpy.logical_not(null_mask(values)) & values.astype(bool)
@@ -3,7 +3,7 @@ from datetime import datetime
 import pytest
 import sqlalchemy as sa
 
-from sqlalchemy_hybrid_utils import column_flag
+from sqlalchemy_hybrid_utils import column_flag, functions
 
 try:
     # Prioritize import path from SQLAlchemy 2.0
@@ -26,13 +26,13 @@ def Message(Base):
         sent_at = sa.Column(sa.DateTime)
         delivered_at = sa.Column("delivery_date", sa.DateTime)
 
-        has_content = column_flag(content)
-        is_sent = column_flag(sent_at, default=sa.func.now())
+        has_content = column_flag(content, preload=True)
+        is_sent = column_flag(sent_at, default=sa.func.now(), preload=True)
         is_sent_scalar = column_flag(sent_at, default=datetime(2020, 1, 1))
         # SQLAlchemy is "smart" and translates datetime.utcnow to an internal structure
         # which makes freezing time and predicting the time impossible
         is_delivered = column_flag(delivered_at, default=lambda: datetime.utcnow())
-        in_transit = column_flag(sent_at & ~delivered_at)
+        in_transit = column_flag(sent_at & ~delivered_at, preload=True)
 
     return Message
 
@@ -45,7 +45,7 @@ def Booking(Base):
         id = sa.Column(sa.Integer, primary_key=True)
         type = sa.Column(sa.Text)
         paid_at = sa.Column(sa.DateTime)
-        is_paid = column_flag(paid_at)
+        is_paid = column_flag(paid_at, preload=True)
 
     return Booking
 
@@ -61,7 +61,7 @@ def Cancellable(Booking):
 
 
 @pytest.fixture(scope="session")
-def engine(Base):
+def engine(Base, Message, Cancellable):
     """Sets up an SQLite databae engine and configures required tables."""
     engine = sa.create_engine("sqlite://", echo=True)
     Base.metadata.create_all(bind=engine)
@@ -76,3 +76,22 @@ def session(engine):
         transaction = connection.begin()
         yield sa.orm.Session(bind=connection)
         transaction.rollback()
+
+
+class Clock:
+    """A clock that advances a day on every reading, counting its readings."""
+
+    def __init__(self):
+        self.readings = 0
+
+    def __call__(self):
+        self.readings += 1
+        return datetime(2020, 1, self.readings)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces the clock that is read for the current time."""
+    clock = Clock()
+    monkeypatch.setattr(functions, "_clock", clock)
+    return clock
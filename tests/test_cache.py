@@ -0,0 +1,114 @@
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+
+from sqlalchemy_hybrid_utils import column_flag
+from sqlalchemy_hybrid_utils.derived_column import get_derived_column
+
+
+@pytest.fixture(scope="module")
+def Letter(Base, engine):
+    class Letter(Base):  # type: ignore
+        __tablename__ = "letter"
+        id = sa.Column(sa.Integer, primary_key=True)
+        content = sa.Column(sa.Text)
+        sent_at = sa.Column(sa.DateTime)
+        delivered_at = sa.Column(sa.DateTime)
+
+        has_content = column_flag(content, cache=True)
+        is_sent = column_flag(sent_at, default=datetime(2020, 1, 1), cache=True)
+        in_transit = column_flag(sent_at & ~delivered_at, cache=True)
+
+    Letter.__table__.create(bind=engine)
+    yield Letter
+    Letter.__table__.drop(bind=engine)
+
+
+def cache_key(flag):
+    cache = get_derived_column(flag).cache
+    assert cache is not None
+    return cache.key
+
+
+def test_value_is_memoized(Letter):
+    letter = Letter(content="Spam")
+    assert letter.has_content
+    assert letter.__dict__[cache_key(Letter.has_content)] is True
+    letter.__dict__["content"] = None  # Bypasses attribute events
+    assert letter.has_content
+
+
+def test_set_invalidates(Letter):
+    letter = Letter(sent_at=datetime(2020, 1, 1))
+    assert letter.in_transit
+    letter.delivered_at = datetime(2020, 1, 2)
+    assert not letter.in_transit
+    letter.sent_at = None
+    letter.delivered_at = None
+    assert not letter.in_transit
+
+
+def test_flag_setter_invalidates(Letter):
+    letter = Letter()
+    assert not letter.is_sent
+    letter.is_sent = True
+    assert letter.is_sent
+    assert letter.sent_at == datetime(2020, 1, 1)
+
+
+def test_del_invalidates(Letter):
+    letter = Letter(content="Spam")
+    assert letter.has_content
+    del letter.content
+    assert not letter.has_content
+
+
+def test_unrelated_set_keeps_cache(Letter):
+    letter = Letter(content="Spam")
+    assert letter.has_content
+    letter.sent_at = datetime(2020, 1, 1)
+    assert cache_key(Letter.has_content) in letter.__dict__
+    assert cache_key(Letter.in_transit) not in letter.__dict__
+
+
+def test_expire_invalidates(Letter, session):
+    letter = Letter(content="Spam")
+    session.add(letter)
+    session.flush()
+    assert letter.has_content
+    statement = sa.update(Letter.__table__).values(content=None)
+    session.execute(statement.where(Letter.__table__.c.id == letter.id))
+    session.expire(letter, ["sent_at"])
+    assert letter.has_content
+    session.expire(letter, ["content"])
+    assert not letter.has_content
+
+
+def test_commit_invalidates(Letter, session):
+    letter = Letter(content="Spam")
+    session.add(letter)
+    session.commit()
+    assert cache_key(Letter.has_content) not in letter.__dict__
+    assert letter.has_content
+
+
+def test_refresh_invalidates(Letter, session):
+    letter = Letter(sent_at=datetime(2020, 1, 1))
+    session.add(letter)
+    session.flush()
+    assert letter.in_transit
+    statement = sa.update(Letter.__table__).values(delivered_at=datetime.now())
+    session.execute(statement.where(Letter.__table__.c.id == letter.id))
+    session.refresh(letter)
+    assert not letter.in_transit
+
+
+def test_mapper_excluding_columns_is_not_instrumented(Base, Letter):
+    class LetterId(Base):  # type: ignore
+        __table__ = Letter.__table__
+        __mapper_args__ = {"include_properties": ["id"]}
+
+    sa.orm.configure_mappers()
+    mapper = sa.inspect(LetterId)
+    assert not mapper.class_manager.dispatch.expire
@@ -2,10 +2,19 @@ from datetime import datetime
 
 import pytest
 from freezegun import freeze_time
-from sqlalchemy import func
+from sqlalchemy import Column, DateTime, Integer, Text, event, func, select
 from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import Session, configure_mappers
 from sqlalchemy.sql import functions
 
+from sqlalchemy_hybrid_utils import column_flag
+from sqlalchemy_hybrid_utils.derived_column import get_derived_column
+
+try:
+    from sqlalchemy.orm import declarative_base
+except ImportError:
+    from sqlalchemy.ext.declarative import declarative_base
+
 
 @pytest.mark.parametrize(
     "content, expected_value", [("Eggs and spam", True), ("", True), (None, False)]
@@ -147,6 +156,30 @@ def test_assign_non_bool_error(Message, flag_value):
         Message(is_sent=flag_value)
 
 
+def test_hybrid_modifiers():
+    class Article(declarative_base()):  # type: ignore
+        __tablename__ = "article"
+        id = Column(Integer, primary_key=True)
+        published_at = Column(DateTime)
+        is_published = column_flag(published_at)
+
+        @is_published.setter  # type: ignore[no-redef]
+        def is_published(self, value):
+            self.published_at = datetime(2020, 1, 1) if value else None  # type: ignore
+
+    derived = get_derived_column(Article.is_published)
+    article = Article(is_published=True)
+    assert article.is_published
+    assert article.published_at == datetime(2020, 1, 1)
+    assert Article.is_published.evaluate_many([article]) == [True]
+
+    overridden = Article.is_published.overrides.expression(  # type: ignore
+        lambda cls: cls.published_at < func.now()
+    )
+    assert get_derived_column(overridden) is derived
+    assert "now" in str(overridden.__get__(None, Article).expression)
+
+
 def test_table_inheritance_base(Booking):
     booking = Booking(paid_at=datetime.utcnow())
     assert booking.type == "standard"
@@ -162,3 +195,214 @@ def test_table_inheritance_subclass(Cancellable):
     assert not booking.is_cancelled
     booking.cancelled_at = datetime.utcnow()
     assert booking.is_cancelled
+
+
+def test_evaluate_many(Message):
+    messages = [Message(content="Spam"), Message(), Message(content="")]
+    assert Message.has_content.evaluate_many(messages) == [True, False, True]
+
+
+def test_evaluate_many_multi_column(Message, session):
+    messages = [
+        Message(sent_at=datetime(2020, 1, 1)),
+        Message(sent_at=datetime(2020, 1, 1), delivered_at=datetime(2020, 1, 2)),
+    ]
+    session.add_all(messages)
+    session.commit()
+    assert Message.in_transit.evaluate_many(iter(messages)) == [True, False]
+
+
+def test_evaluate_many_mixed_classes(Booking, Cancellable):
+    bookings = [
+        Booking(paid_at=datetime.utcnow()),
+        Cancellable(),
+        Booking(),
+        Cancellable(paid_at=datetime.utcnow()),
+    ]
+    assert Booking.is_paid.evaluate_many(bookings) == [True, False, False, True]
+
+
+def test_table_inheritance_comparison_flag():
+    class Ticket(declarative_base()):  # type: ignore
+        __tablename__ = "ticket"
+        __mapper_args__ = {"polymorphic_on": "type", "polymorphic_identity": "standard"}
+        id = Column(Integer, primary_key=True)
+        type = Column(Text)
+        is_standard = column_flag(type == "standard")
+
+    class Upgrade(Ticket):
+        __mapper_args__ = {"polymorphic_identity": "upgrade"}
+
+    tickets = [Ticket(), Upgrade(), Ticket(), Upgrade()]
+    assert tickets[0].is_standard
+    assert not tickets[1].is_standard
+    assert Ticket.is_standard.evaluate_many(tickets) == [True, False, True, False]
+
+
+@pytest.fixture
+def sent_messages(Message, session):
+    messages = [Message(content="Spam"), Message(content="Eggs"), Message()]
+    session.add_all(messages)
+    session.flush()
+    return messages
+
+
+def test_bulk_set_sql_func(Message, session, sent_messages):
+    where = Message.content.isnot(None)
+    before = session.query(func.now()).scalar()
+    assert Message.is_sent.bulk_set(session, Message, where, True) == 2
+    after = session.query(func.now()).scalar()
+    first, second, unsent = (message.sent_at for message in sent_messages)
+    assert before <= first == second <= after
+    assert unsent is None
+    assert Message.is_sent.evaluate_many(sent_messages) == [True, True, False]
+
+
+def test_bulk_set_false(Message, session, sent_messages):
+    Message.is_sent_scalar.bulk_set(session, Message, Message.id.isnot(None), True)
+    assert all(message.is_sent for message in sent_messages)
+    assert (
+        Message.is_sent.bulk_set(session, Message, Message.content == "Spam", False)
+        == 1
+    )
+    assert [message.is_sent for message in sent_messages] == [False, True, True]
+
+
+def test_bulk_set_other_classes_unaffected(Booking, Message, session, sent_messages):
+    booking = Booking(paid_at=datetime(2020, 1, 1))
+    session.add(booking)
+    session.flush()
+    Message.is_sent.bulk_set(session, Message, Message.id.isnot(None), True)
+    assert "paid_at" not in inspect(booking).unloaded
+
+
+def test_bulk_set_python_func_called_once(Message, session, sent_messages):
+    with freeze_time() as clock:
+        Message.is_delivered.bulk_set(session, Message, Message.id.isnot(None), True)
+        delivery_time = clock()
+    session.expire_all()
+    assert {message.delivered_at for message in sent_messages} == {delivery_time}
+
+
+def test_bulk_set_single_statement(Message, engine, session, sent_messages):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        Message.is_sent.bulk_set(session, Message, Message.id.isnot(None), True)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert [statement.split()[0] for statement in statements] == ["UPDATE"]
+
+
+def test_bulk_set_non_bool_error(Message, session):
+    with pytest.raises(TypeError, match="boolean"):
+        Message.is_sent.bulk_set(session, Message, Message.id == 1, 1)
+
+
+def test_bulk_set_without_default_error(Message, session):
+    with pytest.raises(TypeError, match="without default"):
+        Message.has_content.bulk_set(session, Message, Message.id == 1, True)
+
+
+def test_bulk_set_unbound_flag_error(Message, session):
+    flag = column_flag(Message.__table__.c.sent_at, default=func.now())
+    with pytest.raises(TypeError, match="not an attribute of Message"):
+        flag.bulk_set(session, Message, Message.id == 1, True)
+
+
+def test_bulk_set_expires_updated_rows(Message, session, sent_messages):
+    for message in sent_messages:
+        session.refresh(message)
+    session.expunge(sent_messages[2])
+    where = Message.id != sent_messages[1].id
+    assert Message.is_sent.bulk_set(session, Message, where, True) == 2
+    unloaded = [inspect(message).unloaded for message in sent_messages]
+    # Without UPDATE .. RETURNING, all loaded messages are expired
+    returning = getattr(session.get_bind().dialect, "update_returning", False)
+    expected = [True, False, False] if returning else [True, True, False]
+    assert ["sent_at" in names for names in unloaded] == expected
+
+
+def test_bulk_set_without_returning(
+    Booking, Message, session, sent_messages, monkeypatch
+):
+    booking = Booking(paid_at=datetime(2020, 1, 1))
+    session.add(booking)
+    for message in sent_messages:
+        session.refresh(message)
+    dialect = session.get_bind().dialect
+    monkeypatch.setattr(dialect, "update_returning", False, raising=False)
+    where = Message.id == sent_messages[0].id
+    assert Message.is_sent.bulk_set(session, Message, where, True) == 1
+    unloaded = [inspect(message).unloaded for message in sent_messages]
+    assert ["sent_at" in names for names in unloaded] == [True, True, True]
+    assert "paid_at" not in inspect(booking).unloaded
+
+
+def test_bulk_set_single_table_subclass(Base, engine):
+    class Shipment(Base):  # type: ignore
+        __tablename__ = "shipment"
+        __mapper_args__ = {"polymorphic_on": "type", "polymorphic_identity": "base"}
+        id = Column(Integer, primary_key=True)
+        type = Column(Text)
+        sent_at = Column(DateTime)
+        is_sent = column_flag(sent_at, default=datetime(2020, 1, 1))
+
+    class Express(Shipment):
+        __mapper_args__ = {"polymorphic_identity": "express"}
+
+    Shipment.__table__.create(bind=engine)
+    try:
+        with Session(bind=engine) as session:
+            shipments = [Shipment(), Shipment(), Express()]
+            session.add_all(shipments)
+            session.flush()
+            assert Express.is_sent.bulk_set(session, Express, Express.id > 0, True) == 1
+            assert [shipment.is_sent for shipment in shipments] == [False, False, True]
+    finally:
+        Shipment.__table__.drop(bind=engine)
+
+
+def test_row_evaluator_table_select(Message, session):
+    session.add_all([Message(content="Spam"), Message(content=None)])
+    session.flush()
+    statement = select(Message.__table__).order_by(Message.id)
+    evaluate = Message.has_content.row_evaluator(statement.selected_columns)
+    rows = session.execute(statement).all()
+    assert [evaluate(row) for row in rows] == [True, False]
+
+
+def test_row_evaluator_attribute_select(Message, session):
+    session.add(Message(sent_at=datetime(2020, 1, 1)))
+    session.add(Message(sent_at=datetime(2020, 1, 1), delivered_at=datetime.now()))
+    session.flush()
+    statement = select(Message.delivered_at, Message.id, Message.sent_at)
+    evaluate = Message.in_transit.row_evaluator(statement.selected_columns)
+    rows = session.execute(statement.order_by(Message.id)).all()
+    assert [evaluate(row) for row in rows] == [True, False]
+
+
+def test_lazy_flags():
+    class Lazy(declarative_base()):  # type: ignore
+        __tablename__ = "lazy"
+        id = Column(Integer, primary_key=True)
+        content = Column(Text)
+        sent_at = Column(DateTime)
+        has_content = column_flag(content, lazy=True, cache=True)
+        is_sent = column_flag(sent_at, default=datetime(2020, 1, 1), lazy=True)
+
+    expression = get_derived_column(Lazy.has_content).expression
+    assert "serialized" not in vars(expression)
+    configure_mappers()
+    assert "serialized" in vars(expression)
+    assert "compiled" not in vars(expression)
+    lazy = Lazy(content="Spam")
+    assert lazy.has_content
+    assert not lazy.is_sent
+    lazy.is_sent = True
+    assert lazy.is_sent
+    assert lazy.sent_at == datetime(2020, 1, 1)
@@ -0,0 +1,165 @@
+import operator
+from itertools import product
+from typing import Any, List
+
+import pytest
+from sqlalchemy import Boolean, Column, Integer, and_, literal, or_
+
+from sqlalchemy_hybrid_utils.compiler import compile_program, compile_template
+from sqlalchemy_hybrid_utils.expression import (
+    ColumnSymbol,
+    Expression,
+    GroupingSymbol,
+    LiteralSymbol,
+    OperatorSymbol,
+)
+from sqlalchemy_hybrid_utils.program import Program
+
+BOOL_A = Column("bool_a", Boolean)
+BOOL_B = Column("bool_b", Boolean)
+BOOL_C = Column("bool_c", Boolean)
+INT_A = Column("int_a", Integer)
+INT_B = Column("int_b", Integer)
+
+
+def values(mapping):
+    """Returns the getitem operator for the given dictionary."""
+    return mapping.__getitem__
+
+
+def test_compile_literal():
+    evaluator = compile_program([LiteralSymbol(42)])
+    assert evaluator(values({})) == 42
+
+
+def test_compile_column():
+    evaluator = compile_program([ColumnSymbol(INT_A)])
+    assert evaluator(values({INT_A: 7})) == 7
+
+
+def test_compile_operator_operand_order():
+    program = [
+        ColumnSymbol(INT_B),
+        ColumnSymbol(INT_A),
+        OperatorSymbol(operator.sub, 2),
+    ]
+    evaluator = compile_program(program)
+    assert evaluator(values({INT_A: 10, INT_B: 3})) == 7
+
+
+def test_compile_variadic_operator():
+    program = [LiteralSymbol(1), LiteralSymbol(5), LiteralSymbol(3)]
+    evaluator = compile_program([*program, OperatorSymbol(max, 3)])
+    assert evaluator(values({})) == 5
+
+
+def test_compile_grouping():
+    program = [LiteralSymbol(1), LiteralSymbol(2), GroupingSymbol(2)]
+    evaluator = compile_program(program)
+    assert sorted(evaluator(values({}))) == [1, 2]
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        pytest.param(BOOL_A, id="column"),
+        pytest.param(~BOOL_A, id="negation"),
+        pytest.param(BOOL_A & ~BOOL_B, id="conjunction"),
+        pytest.param(and_(BOOL_A, BOOL_B, BOOL_C), id="multi-clause conjunction"),
+        pytest.param(BOOL_A | BOOL_B | BOOL_C, id="multi-clause disjunction"),
+        pytest.param((BOOL_A & ~BOOL_B) | BOOL_C, id="mixed"),
+        pytest.param(BOOL_A & (INT_A > INT_B), id="comparison"),
+        pytest.param(INT_A.in_([INT_B, INT_B * 2, 3]), id="grouping"),
+        pytest.param(~(BOOL_A & (INT_A > INT_B)), id="negated group"),
+        pytest.param(~~(BOOL_A | BOOL_B), id="double negated group"),
+        pytest.param(BOOL_A & (literal(1) == 1), id="constant operand"),
+    ],
+)
+def test_compiled_matches_interpreter(expr):
+    expression = Expression(expr)
+    for bools in product([False, True], repeat=3):
+        for ints in product([1, 3, 6], repeat=2):
+            inputs = dict(zip([BOOL_A, BOOL_B, BOOL_C, INT_A, INT_B], bools + ints))
+            interpreted = expression.interpret(values(inputs))
+            assert expression.evaluate(values(inputs)) == interpreted
+
+
+def recording_values(mapping, accessed):
+    """Returns a value getter that records each column accessed."""
+
+    def _getter(column):
+        accessed.append(column)
+        return mapping[column]
+
+    return _getter
+
+
+@pytest.mark.parametrize(
+    "expr, inputs, expected_reads",
+    [
+        pytest.param(BOOL_A & BOOL_B, {BOOL_A: False}, [BOOL_A], id="AND decided"),
+        pytest.param(BOOL_A | BOOL_B, {BOOL_A: True}, [BOOL_A], id="OR decided"),
+        pytest.param(
+            and_(BOOL_A, BOOL_B, BOOL_C),
+            {BOOL_A: True, BOOL_B: False},
+            [BOOL_A, BOOL_B],
+            id="multi-clause AND decided",
+        ),
+        pytest.param(
+            or_(BOOL_A, BOOL_B, BOOL_C),
+            {BOOL_A: False, BOOL_B: True},
+            [BOOL_A, BOOL_B],
+            id="multi-clause OR decided",
+        ),
+        pytest.param(
+            BOOL_A & BOOL_B,
+            {BOOL_A: True, BOOL_B: False},
+            [BOOL_A, BOOL_B],
+            id="AND undecided",
+        ),
+    ],
+)
+def test_short_circuit_column_reads(expr, inputs, expected_reads):
+    accessed: List[Column[Any]] = []
+    expression = Expression(expr)
+    expression.evaluate(recording_values(inputs, accessed))
+    assert accessed == expected_reads
+
+
+@pytest.mark.parametrize(
+    "expr, inputs, expected",
+    [
+        (BOOL_A & BOOL_B, {BOOL_A: True, BOOL_B: True}, True),
+        (BOOL_A & BOOL_B, {BOOL_A: None, BOOL_B: True}, False),
+        (BOOL_A | BOOL_B, {BOOL_A: False, BOOL_B: False}, False),
+        (or_(BOOL_A, BOOL_B, BOOL_C), {BOOL_A: 0, BOOL_B: 0, BOOL_C: 2}, True),
+    ],
+)
+def test_short_circuit_returns_bool(expr, inputs, expected):
+    assert Expression(expr).evaluate(values(inputs)) is expected
+
+
+def test_templates_shared_across_columns():
+    first = Expression(BOOL_A & (INT_A > 5))
+    second = Expression(BOOL_B & (INT_B > 5))
+    assert first.template is second.template
+    assert first.evaluate(values({BOOL_A: True, INT_A: 6})) is True
+    assert second.evaluate(values({BOOL_B: True, INT_B: 5})) is False
+
+
+@pytest.mark.parametrize(
+    "left, right",
+    [
+        pytest.param(INT_A == 1, INT_B == 1.0, id="literal type"),
+        pytest.param(INT_A > INT_B, INT_B > INT_B, id="column slots"),
+        pytest.param(INT_A > 5, INT_A < 5, id="operator"),
+    ],
+)
+def test_templates_distinct_structure(left, right):
+    assert Expression(left).template is not Expression(right).template
+
+
+def test_templates_with_unhashable_literals():
+    program = Program.from_symbols([LiteralSymbol([1, 2])])
+    assert compile_template(program) is not compile_template(program)
+    assert compile_template(program)(values({})) == [1, 2]
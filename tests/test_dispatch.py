@@ -0,0 +1,143 @@
+import gc
+
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table, Text
+from sqlalchemy.inspection import inspect
+
+from sqlalchemy_hybrid_utils.dispatch import (
+    BeforeConfiguredQueue,
+    MapperConfiguredDispatcher,
+)
+
+try:
+    from sqlalchemy.orm import declarative_base
+except ImportError:
+    from sqlalchemy.ext.declarative import declarative_base
+
+
+def make_models():
+    class Base(declarative_base()):  # type: ignore
+        __abstract__ = True
+
+    class Spam(Base):
+        __tablename__ = "dispatch_spam"
+        id = Column(Integer, primary_key=True)
+        kind = Column(Text)
+        __mapper_args__ = {"polymorphic_on": kind, "polymorphic_identity": "spam"}
+
+    class Ham(Spam):
+        __tablename__ = "dispatch_ham"
+        id = Column(Integer, ForeignKey(Spam.id), primary_key=True)
+        __mapper_args__ = {"polymorphic_identity": "ham"}
+
+    class Eggs(Base):
+        __tablename__ = "dispatch_eggs"
+        id = Column(Integer, primary_key=True)
+
+    return Spam, Ham, Eggs
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def handler(self, mapper, mapped_class):
+        self.calls.append(mapped_class)
+
+
+def dispatch_all(dispatcher, *models):
+    for model in models:
+        dispatcher.dispatch(inspect(model), model)
+
+
+def test_dispatch_by_table():
+    Spam, Ham, Eggs = make_models()
+    dispatcher = MapperConfiguredDispatcher()
+    recorder = Recorder()
+    dispatcher.register({Spam.__table__.c.kind}, recorder.handler)
+    dispatch_all(dispatcher, Spam, Ham, Eggs)
+    assert recorder.calls == [Spam, Ham]
+
+
+def test_dispatch_once_per_mapper():
+    Spam, Ham, Eggs = make_models()
+    dispatcher = MapperConfiguredDispatcher()
+    recorder = Recorder()
+    columns = {Spam.__table__.c.kind, Ham.__table__.c.id, Eggs.__table__.c.id}
+    dispatcher.register(columns, recorder.handler)
+    dispatch_all(dispatcher, Spam, Ham, Eggs)
+    assert recorder.calls == [Spam, Ham, Eggs]
+
+
+def test_dispatch_waits_for_table_attachment():
+    Spam, Ham, Eggs = make_models()
+    dispatcher = MapperConfiguredDispatcher()
+    recorder = Recorder()
+    detached = Column("detached", Text)
+    dispatcher.register({detached}, recorder.handler)
+    dispatch_all(dispatcher, Eggs)
+    Table("dispatch_other", MetaData(), detached)
+    dispatch_all(dispatcher, Spam)
+    assert recorder.calls == []
+    Eggs.__table__.append_column(Column("attached", Text))
+    dispatcher.register({Eggs.__table__.c.attached}, recorder.handler)
+    dispatch_all(dispatcher, Eggs)
+    assert recorder.calls == [Eggs]
+
+
+def test_function_handler():
+    Spam, Ham, Eggs = make_models()
+    dispatcher = MapperConfiguredDispatcher()
+    calls = []
+
+    def handler(mapper, mapped_class):
+        calls.append(mapped_class)
+
+    dispatcher.register({Eggs.__table__.c.id}, handler)
+    dispatch_all(dispatcher, Eggs)
+    assert calls == [Eggs]
+
+
+def test_collected_handlers_are_detached():
+    Spam, Ham, Eggs = make_models()
+    dispatcher = MapperConfiguredDispatcher()
+    recorder, collected = Recorder(), Recorder()
+    dispatcher.register({Eggs.__table__.c.id}, recorder.handler)
+    dispatcher.register({Eggs.__table__.c.id}, collected.handler)
+    dispatcher.register({Column("pending", Text)}, Recorder().handler)
+    dispatch_all(dispatcher, Eggs)
+    del collected
+    gc.collect()
+    dispatch_all(dispatcher, Eggs)
+    assert recorder.calls == [Eggs, Eggs]
+    assert len(dispatcher._handlers[Eggs.__table__]) == 1
+    assert not dispatcher._pending
+
+
+def test_before_configured_callbacks_called_once():
+    queue = BeforeConfiguredQueue()
+    calls = []
+
+    def callback():
+        calls.append("spam")
+
+    queue.add(callback)
+    queue.dispatch()
+    queue.dispatch()
+    assert calls == ["spam"]
+
+
+def test_before_configured_collected_callbacks_skipped():
+    queue = BeforeConfiguredQueue()
+    calls = []
+
+    class Callback:
+        def __call__(self):
+            calls.append(self)
+
+    live, collected = Callback(), Callback()
+    queue.add(live)
+    queue.add(collected)
+    del collected
+    gc.collect()
+    queue.dispatch()
+    assert calls == [live]
@@ -1,5 +1,5 @@
 import pytest
-from sqlalchemy import Boolean, Column, Integer, Text, and_, func, or_
+from sqlalchemy import Boolean, Column, Integer, Text, and_, bindparam, func, or_
 
 from sqlalchemy_hybrid_utils.expression import Expression
 
@@ -52,6 +52,32 @@ def test_serlialize_unsupported_opeator():
         Expression(INT_A.op("^")(INT_A))
 
 
+def test_serialize_expanding_parameter_without_value():
+    with pytest.raises(TypeError, match="Expanding parameter 'ids' has no value"):
+        Expression(INT_A.in_(bindparam("ids", expanding=True)))
+
+
+def test_expression_compiles_template_eagerly():
+    expression = Expression(BOOL_A & (INT_A > 5))
+    assert "template" in vars(expression)
+    assert "compiled" not in vars(expression)
+    assert expression.evaluate(values({BOOL_A: True, INT_A: 6})) is True
+    assert "compiled" in vars(expression)
+
+
+def test_lazy_expression_defers_serialization():
+    expression = Expression(func.exp(INT_A, 2), lazy=True)
+    assert "serialized" not in vars(expression)
+    with pytest.raises(TypeError, match="Unsupported expression"):
+        expression.evaluate(values({INT_A: 1}))
+
+
+def test_lazy_expression_evaluation():
+    expression = Expression(BOOL_A & (INT_A > 5), lazy=True)
+    assert expression.evaluate(values({BOOL_A: True, INT_A: 6})) is True
+    assert expression == Expression(BOOL_A & (INT_A > 5))
+
+
 # Boolean expression evaluation
 @pytest.mark.parametrize(
     "inputs, expected", [({BOOL_A: False}, False), ({BOOL_A: True}, True)]
@@ -170,6 +196,20 @@ def test_bool_empty_clauselists(clause_wrapper):
     assert expression.evaluate(values({})) is True
 
 
+@pytest.mark.parametrize(
+    "inputs, expected",
+    [
+        ({BOOL_A: False, INT_A: 10}, True),
+        ({BOOL_A: True, INT_A: 1}, True),
+        ({BOOL_A: True, INT_A: 10}, False),
+    ],
+)
+def test_bool_negated_group(inputs, expected):
+    expression = Expression(~(BOOL_A & (INT_A > 5)))
+    assert expression.evaluate(values(inputs)) is expected
+    assert expression.interpret(values(inputs)) is expected
+
+
 # Math expression evaluation
 def test_addition():
     expr = Expression(INT_A + INT_B)
@@ -215,6 +255,17 @@ def test_evaluate_bind_param_contains():
     assert not expr.evaluate(values({INT_A: 6}))
 
 
+def test_evaluate_bind_param_contains_empty():
+    expr = Expression(INT_A.in_([]))
+    assert not expr.evaluate(values({INT_A: 3}))
+
+
+def test_evaluate_bind_param_contains_interpreted():
+    expr = Expression(INT_A.in_([1, 2, 3, 4, 5]))
+    assert expr.interpret(values({INT_A: 3}))
+    assert not expr.interpret(values({INT_A: None}))
+
+
 @pytest.mark.parametrize(
     "inputs, expected",
     [
@@ -0,0 +1,279 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, Text, case, func, literal, select
+
+from sqlalchemy_hybrid_utils import (
+    functions,
+    now_scope,
+    register_function,
+    register_operator,
+    use_clock,
+)
+from sqlalchemy_hybrid_utils.derived_column import DerivedColumn
+from sqlalchemy_hybrid_utils.expression import Expression, LiteralSymbol
+from sqlalchemy_hybrid_utils.functions import (
+    SQL_FUNCTIONS,
+    SQL_OPERATORS,
+    like,
+    like_regex,
+    not_between,
+    utc_now,
+)
+
+DATE = Column("date", DateTime)
+INT_A = Column("int_a", Integer)
+INT_B = Column("int_b", Integer)
+TEXT = Column("text", Text)
+TEXT_B = Column("text_b", Text)
+
+
+def evaluate(expr, inputs):
+    expression = Expression(expr)
+    result = expression.evaluate(inputs.__getitem__)
+    assert expression.interpret(inputs.__getitem__) == result
+    return result
+
+
+@pytest.mark.parametrize(
+    "expr, value, expected",
+    [
+        pytest.param(TEXT.like("ab%"), "abc", True, id="LIKE prefix"),
+        pytest.param(TEXT.like("ab%"), "cab", False, id="LIKE prefix mismatch"),
+        pytest.param(TEXT.like("a_c"), "abc", True, id="LIKE single"),
+        pytest.param(TEXT.like("a_c"), "abbc", False, id="LIKE single mismatch"),
+        pytest.param(TEXT.like("a.c"), "abc", False, id="LIKE regex characters"),
+        pytest.param(TEXT.like("%\n%"), "a\nb", True, id="LIKE newline"),
+        pytest.param(TEXT.like("ab"), "AB", False, id="LIKE case sensitive"),
+        pytest.param(TEXT.ilike("ab"), "AB", True, id="ILIKE"),
+        pytest.param(TEXT.like("a/%", escape="/"), "a%", True, id="escape"),
+        pytest.param(TEXT.like("a/%", escape="/"), "ab", False, id="escape mismatch"),
+        pytest.param(TEXT.like("a/%", escape="/"), "a/b", False, id="escape literal"),
+        pytest.param(TEXT.like("a/"), "a/", True, id="no escape character"),
+        pytest.param(~TEXT.like("ab%"), "abc", False, id="NOT LIKE"),
+        pytest.param(~TEXT.ilike("AB%"), "cab", True, id="NOT ILIKE"),
+        pytest.param(TEXT.like("ab%"), None, None, id="LIKE NULL"),
+        pytest.param(~TEXT.like("ab%"), None, None, id="NOT LIKE NULL"),
+        pytest.param(~TEXT.ilike("ab%"), None, None, id="NOT ILIKE NULL"),
+    ],
+)
+def test_like(expr, value, expected):
+    assert evaluate(expr, {TEXT: value}) is expected
+
+
+@pytest.mark.parametrize(
+    "expr, value, expected",
+    [
+        pytest.param(TEXT.startswith("ab"), "abc", True, id="startswith"),
+        pytest.param(TEXT.startswith("ab"), "cab", False, id="startswith mismatch"),
+        pytest.param(TEXT.startswith("a_"), "abc", True, id="startswith wildcard"),
+        pytest.param(TEXT.endswith("bc"), "abc", True, id="endswith"),
+        pytest.param(TEXT.endswith("ab"), "abc", False, id="endswith mismatch"),
+        pytest.param(TEXT.contains("b"), "abc", True, id="contains"),
+        pytest.param(TEXT.contains("d"), "abc", False, id="contains mismatch"),
+        pytest.param(~TEXT.startswith("ab"), "abc", False, id="NOT startswith"),
+        pytest.param(~TEXT.endswith("ab"), "abc", True, id="NOT endswith"),
+        pytest.param(~TEXT.contains("d"), "abc", True, id="NOT contains"),
+        pytest.param(TEXT.contains("%", autoescape=True), "a%c", True, id="escaped"),
+        pytest.param(TEXT.contains("%", autoescape=True), "abc", False, id="literal"),
+        pytest.param(TEXT.startswith("ab"), None, None, id="startswith NULL"),
+        pytest.param(~TEXT.contains("ab"), None, None, id="NOT contains NULL"),
+    ],
+)
+def test_like_affixed(expr, value, expected):
+    assert evaluate(expr, {TEXT: value}) is expected
+
+
+@pytest.mark.skipif(not hasattr(TEXT, "icontains"), reason="Added in SQLAlchemy 2.0")
+def test_like_affixed_ignore_case():
+    assert evaluate(TEXT.istartswith("AB"), {TEXT: "abc"}) is True
+    assert evaluate(~TEXT.icontains("B"), {TEXT: "abc"}) is False
+
+
+def test_like_column_pattern():
+    expr = TEXT.like(TEXT_B)
+    assert evaluate(expr, {TEXT: "abc", TEXT_B: "a%"}) is True
+    assert evaluate(expr, {TEXT: "abc", TEXT_B: None}) is None
+    suffix = TEXT.endswith(TEXT_B)
+    assert evaluate(suffix, {TEXT: "abc", TEXT_B: "c"}) is True
+    assert evaluate(suffix, {TEXT: "abc", TEXT_B: None}) is None
+
+
+def test_like_regex_cached_per_pattern():
+    like_regex.cache_clear()
+    for value in ("abc", "bcd", "cde"):
+        like(value, "%c%")
+    assert like_regex.cache_info().misses == 1
+    assert like_regex.cache_info().hits == 2
+
+
+@pytest.mark.parametrize(
+    "expr, value, expected",
+    [
+        pytest.param(INT_A.between(1, 3), 1, True, id="lower bound"),
+        pytest.param(INT_A.between(1, 3), 3, True, id="upper bound"),
+        pytest.param(INT_A.between(1, 3), 4, False, id="outside"),
+        pytest.param(INT_A.between(3, 1), 2, False, id="reversed bounds"),
+        pytest.param(INT_A.between(3, 1, symmetric=True), 2, True, id="symmetric"),
+        pytest.param(~INT_A.between(1, 3), 4, True, id="NOT BETWEEN"),
+        pytest.param(INT_A.between(1, 3), None, None, id="NULL"),
+        pytest.param(~INT_A.between(1, 3), None, None, id="NOT BETWEEN NULL"),
+    ],
+)
+def test_between(expr, value, expected):
+    assert evaluate(expr, {INT_A: value}) is expected
+
+
+def test_between_null_bound():
+    assert not_between(2, 1, None) is None
+
+
+@pytest.mark.parametrize(
+    "expr, inputs, expected",
+    [
+        pytest.param(func.coalesce(INT_A, INT_B, 5), {INT_A: 1, INT_B: 2}, 1),
+        pytest.param(func.coalesce(INT_A, INT_B, 5), {INT_A: None, INT_B: 2}, 2),
+        pytest.param(func.coalesce(INT_A, INT_B), {INT_A: None, INT_B: None}, None),
+        pytest.param(func.abs(INT_A), {INT_A: -4}, 4),
+        pytest.param(func.lower(TEXT), {TEXT: "AbC"}, "abc"),
+        pytest.param(func.UPPER(TEXT), {TEXT: "AbC"}, "ABC"),
+        pytest.param(func.length(TEXT), {TEXT: "abc"}, 3),
+        pytest.param(func.char_length(TEXT), {TEXT: None}, None),
+        pytest.param(TEXT + "!", {TEXT: "abc"}, "abc!"),
+        pytest.param(TEXT + "!", {TEXT: None}, None),
+    ],
+)
+def test_functions(expr, inputs, expected):
+    assert evaluate(expr, inputs) == expected
+
+
+def test_function_comparison():
+    expr = func.length(func.lower(TEXT)) > 2
+    assert evaluate(expr, {TEXT: "ABC"}) is True
+    assert evaluate(expr, {TEXT: "AB"}) is False
+
+
+@pytest.mark.parametrize(
+    "value, expected", [(1, "one"), (2, "two"), (3, "many"), (None, "many")]
+)
+def test_case_when(value, expected):
+    expr = case((INT_A == 1, "one"), (INT_A == 2, "two"), else_="many")
+    assert evaluate(expr, {INT_A: value}) == expected
+
+
+@pytest.mark.parametrize("value, expected", [(1, "one"), (3, None), (None, None)])
+def test_case_value(value, expected):
+    expr = case({1: "one", 2: "two"}, value=INT_A)
+    assert evaluate(expr, {INT_A: value}) == expected
+
+
+def test_constant_function_folded():
+    expression = Expression(func.lower(literal("ABC")))
+    assert tuple(expression.optimized) == (LiteralSymbol("abc"),)
+
+
+def test_unregistered_function():
+    with pytest.raises(TypeError, match="Unsupported expression"):
+        Expression(func.reverse(TEXT))
+
+
+@pytest.fixture
+def registry():
+    functions, operators = dict(SQL_FUNCTIONS), dict(SQL_OPERATORS)
+    yield
+    SQL_FUNCTIONS.clear()
+    SQL_FUNCTIONS.update(functions)
+    SQL_OPERATORS.clear()
+    SQL_OPERATORS.update(operators)
+
+
+def test_register_function(registry):
+    register_function("Reverse", lambda value: value[::-1])
+    assert evaluate(func.reverse(TEXT), {TEXT: "abc"}) == "cba"
+
+
+def test_register_custom_operator(registry):
+    register_operator("^", pow)
+    assert evaluate(INT_A.op("^")(INT_B), {INT_A: 2, INT_B: 3}) == 8
+
+
+# Current time
+@pytest.mark.parametrize("expr", [func.now(), func.current_timestamp()])
+def test_now(clock, expr):
+    expression = Expression(DATE < expr)
+    assert expression.evaluate({DATE: datetime(2020, 1, 1)}.__getitem__) is False
+    assert expression.evaluate({DATE: datetime(2020, 1, 1)}.__getitem__) is True
+
+
+def test_now_not_folded():
+    assert len(Expression(func.now()).optimized) == 1
+
+
+def test_now_scope(clock):
+    expression = Expression(DATE < func.now())
+    with now_scope() as now:
+        assert now == datetime(2020, 1, 1)
+        for _ in range(3):
+            assert expression.evaluate({DATE: now}.__getitem__) is False
+    assert clock.readings == 1
+
+
+def test_now_scope_timestamp(clock):
+    with now_scope(datetime(2021, 6, 1)) as now:
+        expression = Expression(DATE < func.now())
+        assert expression.evaluate({DATE: now}.__getitem__) is False
+    assert clock.readings == 0
+
+
+def test_now_scope_nested(clock):
+    with now_scope() as outer:
+        with now_scope() as inner:
+            assert inner == outer
+        with now_scope(datetime(2021, 6, 1)) as fixed:
+            assert functions.current_timestamp() == fixed
+        assert functions.current_timestamp() == outer
+    assert functions.current_timestamp() == datetime(2020, 1, 2)
+
+
+def test_evaluate_many_reads_clock_once(Message, clock):
+    expression = Expression(Message.__table__.c.sent_at < func.now())
+    derived = DerivedColumn(expression, prefetch_attribute_names=False)
+    messages = [Message(sent_at=datetime(2020, 1, 1)) for _ in range(3)]
+    assert derived.evaluate_many(messages) == [False, False, False]
+    assert clock.readings == 1
+
+
+@pytest.fixture
+def tokyo_time(monkeypatch):
+    monkeypatch.setenv("TZ", "Asia/Tokyo")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_now_agrees_with_sqlite(session, tokyo_time):
+    database_now = session.execute(select(func.now())).scalar()
+    assert abs(functions.current_timestamp() - database_now) < timedelta(seconds=5)
+
+
+@pytest.fixture
+def fixed_clock():
+    use_clock(lambda: datetime(2021, 6, 1))
+    yield
+    use_clock(utc_now)
+
+
+def test_use_clock(fixed_clock):
+    assert functions.current_timestamp() == datetime(2021, 6, 1)
+    with now_scope() as now:
+        assert now == datetime(2021, 6, 1)
+
+
+def test_now_scope_clock(clock):
+    with now_scope(clock=lambda: datetime(2021, 6, 1)) as now:
+        assert now == datetime(2021, 6, 1)
+        with now_scope(clock=lambda: datetime(2022, 1, 1)) as nested:
+            assert nested == now
+    assert clock.readings == 0
@@ -0,0 +1,145 @@
+import operator
+
+import pytest
+from sqlalchemy import Boolean, Column, Integer, and_, literal, or_
+
+from sqlalchemy_hybrid_utils.expression import (
+    ColumnSymbol,
+    Expression,
+    GroupingSymbol,
+    LiteralSymbol,
+    OperatorSymbol,
+)
+from sqlalchemy_hybrid_utils.functions import all_of, any_of, is_in
+from sqlalchemy_hybrid_utils.optimizer import eliminate_dead_branches, optimize
+
+BOOL_A = Column("bool_a", Boolean)
+BOOL_B = Column("bool_b", Boolean)
+BOOL_C = Column("bool_c", Boolean)
+INT_A = Column("int_a", Integer)
+
+A = ColumnSymbol(BOOL_A)
+B = ColumnSymbol(BOOL_B)
+C = ColumnSymbol(BOOL_C)
+AND = OperatorSymbol(operator.and_, arity=2)
+OR = OperatorSymbol(operator.or_, arity=2)
+NOT = OperatorSymbol(operator.not_, arity=1)
+TRUTH = OperatorSymbol(bool, arity=1)
+
+
+@pytest.mark.parametrize(
+    "program, expected",
+    [
+        pytest.param(
+            [LiteralSymbol(2), LiteralSymbol(3), OperatorSymbol(operator.mul, 2)],
+            [LiteralSymbol(6)],
+            id="operator",
+        ),
+        pytest.param(
+            [LiteralSymbol(1), LiteralSymbol(2), GroupingSymbol(2)],
+            [LiteralSymbol([2, 1])],
+            id="grouping",
+        ),
+        pytest.param(
+            [LiteralSymbol(0), LiteralSymbol(1), OperatorSymbol(operator.truediv, 2)],
+            [LiteralSymbol(0), LiteralSymbol(1), OperatorSymbol(operator.truediv, 2)],
+            id="error left for runtime",
+        ),
+        pytest.param(
+            [LiteralSymbol(1), ColumnSymbol(INT_A), OperatorSymbol(operator.gt, 2)],
+            [LiteralSymbol(1), ColumnSymbol(INT_A), OperatorSymbol(operator.gt, 2)],
+            id="column operand",
+        ),
+    ],
+)
+def test_constant_folding(program, expected):
+    assert optimize(program) == tuple(expected)
+
+
+@pytest.mark.parametrize(
+    "program, expected",
+    [
+        pytest.param(
+            [A, B, AND, C, AND], [A, B, C, OperatorSymbol(all_of, 3)], id="AND"
+        ),
+        pytest.param([A, B, C, OR, OR], [A, B, C, OperatorSymbol(any_of, 3)], id="OR"),
+        pytest.param([A, B, AND, C, OR], [A, B, AND, C, OR], id="mixed"),
+    ],
+)
+def test_flatten_associative(program, expected):
+    assert optimize(program) == tuple(expected)
+
+
+@pytest.mark.parametrize(
+    "program, expected",
+    [
+        pytest.param([A, NOT, NOT], [A, TRUTH], id="column"),
+        pytest.param([A, B, AND, NOT, NOT], [A, B, AND], id="boolean operator"),
+        pytest.param([A, NOT, NOT, NOT], [A, NOT], id="triple negation"),
+        pytest.param(
+            [LiteralSymbol(None), A, OperatorSymbol(operator.eq, 2), NOT],
+            [LiteralSymbol(None), A, OperatorSymbol(operator.ne, 2)],
+            id="negated IS NULL",
+        ),
+    ],
+)
+def test_remove_double_negation(program, expected):
+    assert optimize(program) == tuple(expected)
+
+
+@pytest.mark.parametrize(
+    "expr, expected",
+    [
+        pytest.param(BOOL_A & (literal(1) == 1), [A, TRUTH], id="AND true"),
+        pytest.param(
+            BOOL_A & (literal(1) == 2), [LiteralSymbol(False)], id="AND false"
+        ),
+        pytest.param(BOOL_A | (literal(1) == 1), [LiteralSymbol(True)], id="OR true"),
+        pytest.param(or_(BOOL_A, BOOL_B, literal(1) == 2), [A, B, OR], id="OR false"),
+        pytest.param(
+            and_(literal(1) == 1, literal(2) == 2), [LiteralSymbol(True)], id="empty"
+        ),
+        pytest.param(
+            (INT_A > 1) & (literal(1) == 1),
+            [LiteralSymbol(1), ColumnSymbol(INT_A), OperatorSymbol(operator.gt, 2)],
+            id="boolean remainder",
+        ),
+    ],
+)
+def test_eliminate_dead_branches(expr, expected):
+    assert tuple(Expression(expr).optimized) == tuple(expected)
+
+
+def test_eliminate_dead_branches_single_pass():
+    program = [LiteralSymbol(1), LiteralSymbol(True), AND]
+    passes = [eliminate_dead_branches]
+    assert optimize(program, passes=passes) == (LiteralSymbol(True),)
+
+
+def test_optimize_without_passes():
+    program = (A, NOT, NOT, B, AND)
+    assert optimize(program, passes=()) == program
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        pytest.param(INT_A.in_([1, 2, 2, 3]), id="expanding"),
+        pytest.param(INT_A.in_([literal(1), literal(2), 3]), id="grouping"),
+    ],
+)
+def test_freeze_membership_tests(expr):
+    expected_values = LiteralSymbol(frozenset({1, 2, 3}))
+    expected = expected_values, ColumnSymbol(INT_A), OperatorSymbol(is_in, 2)
+    assert tuple(Expression(expr).optimized) == expected
+
+
+def test_freeze_membership_tests_unhashable():
+    program = [LiteralSymbol([[1], [2]]), ColumnSymbol(INT_A), OperatorSymbol(is_in, 2)]
+    assert optimize(program) == tuple(program)
+
+
+def test_expression_before_and_after():
+    expression = Expression(~~(BOOL_A & BOOL_B))
+    assert tuple(expression.serialized) == (A, B, AND, NOT, NOT)
+    assert tuple(expression.optimized) == (A, B, AND)
@@ -0,0 +1,79 @@
+import operator
+
+import pytest
+from sqlalchemy import Boolean, Column, Integer
+
+from sqlalchemy_hybrid_utils.expression import Expression
+from sqlalchemy_hybrid_utils.program import Program
+from sqlalchemy_hybrid_utils.symbols import (
+    ColumnSymbol,
+    GroupingSymbol,
+    LiteralSymbol,
+    OperatorSymbol,
+)
+
+BOOL_A = Column("bool_a", Boolean)
+INT_A = Column("int_a", Integer)
+SYMBOLS = (
+    LiteralSymbol(5),
+    ColumnSymbol(INT_A),
+    OperatorSymbol(operator.gt, arity=2),
+    ColumnSymbol(INT_A),
+    LiteralSymbol(True),
+    GroupingSymbol(2),
+    OperatorSymbol(operator.and_, arity=2),
+)
+
+
+def test_program_round_trip():
+    program = Program.from_symbols(SYMBOLS)
+    assert len(program) == len(SYMBOLS)
+    assert tuple(program) == SYMBOLS
+    assert program[1] == SYMBOLS[1]
+    assert program[-1] == SYMBOLS[-1]
+    assert repr(program).startswith("Program([LiteralSymbol(value=5)")
+
+
+def test_program_constant_pool():
+    program = Program.from_symbols(SYMBOLS)
+    assert program.constants == (5, INT_A, operator.gt, True, operator.and_)
+    assert program.code.itemsize == 2
+    assert program.columns == {INT_A}
+
+
+def test_program_unhashable_literals():
+    symbols = [LiteralSymbol([1, 2]), LiteralSymbol([1, 2])]
+    program = Program.from_symbols(symbols)
+    assert program.constants == ([1, 2], [1, 2])
+    with pytest.raises(TypeError, match="unhashable"):
+        hash(program)
+
+
+def test_program_equality_and_hash():
+    left = Program.from_symbols(SYMBOLS)
+    right = Program.from_symbols(SYMBOLS)
+    assert left == right
+    assert hash(left) == hash(right)
+    assert left != Program.from_symbols(SYMBOLS[:3])
+    assert left != SYMBOLS
+
+
+def test_expression_hash():
+    expressions = {Expression(BOOL_A & (INT_A > 5)), Expression(BOOL_A & (INT_A > 5))}
+    assert len(expressions) == 1
+
+
+@pytest.mark.parametrize("symbol", SYMBOLS[:3] + SYMBOLS[5:6])
+def test_symbols_are_slotted(symbol):
+    assert not hasattr(symbol, "__dict__")
+
+
+def test_program_structure():
+    program = Program.from_symbols(SYMBOLS)
+    other = Program.from_symbols(
+        [ColumnSymbol(BOOL_A) if symbol == SYMBOLS[1] else symbol for symbol in SYMBOLS]
+    )
+    assert program.slot_columns == (INT_A,)
+    assert other.slot_columns == (BOOL_A,)
+    assert program != other
+    assert program.structure == other.structure
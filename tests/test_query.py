@@ -0,0 +1,470 @@
+import threading
+from datetime import datetime
+from typing import Any, Dict, List
+
+import pytest
+import sqlalchemy as sa
+from freezegun import freeze_time
+
+from sqlalchemy_hybrid_utils import (
+    column_flag,
+    count_flags,
+    flag_attributes,
+    iter_flags,
+    load_flags,
+    strict_loading,
+    translate_flags,
+    undefer_flags,
+    use_strict_loading,
+)
+from sqlalchemy_hybrid_utils.derived_column import get_derived_column
+
+
+@pytest.fixture
+def messages(Message, session):
+    messages = [
+        Message(content="Spam", sent_at=datetime(2020, 1, 1)),
+        Message(sent_at=datetime(2020, 1, 1), delivered_at=datetime(2020, 1, 2)),
+        Message(content="Eggs"),
+    ]
+    session.add_all(messages)
+    session.flush()
+    return messages
+
+
+def test_iter_flags(Message, session, messages):
+    results = iter_flags(session, Message, Message.has_content, Message.in_transit)
+    assert sorted(results) == [
+        (messages[0].id, True, True),
+        (messages[1].id, False, False),
+        (messages[2].id, True, False),
+    ]
+
+
+def test_iter_flags_small_batches(Message, session, messages):
+    results = iter_flags(session, Message, Message.is_sent, batch_size=1)
+    assert sorted(results) == [
+        (messages[0].id, True),
+        (messages[1].id, True),
+        (messages[2].id, False),
+    ]
+
+
+def test_iter_flags_reads_clock_per_batch(Message, session, messages, clock):
+    sent_at = sa.func.coalesce(Message.__table__.c.sent_at, datetime(2000, 1, 1))
+    flag = column_flag(sent_at < sa.func.now())
+    results = iter_flags(session, Message, flag, batch_size=2)
+    assert len(list(results)) == 3
+    assert clock.readings == 2
+
+
+def test_iter_flags_polymorphic(Booking, Cancellable, session):
+    booking = Booking(paid_at=datetime(2020, 1, 1))
+    cancelled = Cancellable(cancelled_at=datetime(2020, 1, 1))
+    session.add_all([booking, cancelled])
+    session.flush()
+    results = iter_flags(session, Cancellable, Cancellable.is_cancelled)
+    assert list(results) == [(cancelled.id, True)]
+    results = iter_flags(session, Booking, Booking.is_paid)
+    assert sorted(results) == [(booking.id, True), (cancelled.id, False)]
+
+
+def test_iter_flags_composite_key(Base, engine):
+    class Pair(Base):  # type: ignore
+        __tablename__ = "flag_pair"
+        left = sa.Column(sa.Integer, primary_key=True)
+        right = sa.Column(sa.Integer, primary_key=True)
+        label = sa.Column(sa.Text)
+        has_label = column_flag(label)
+
+    Pair.__table__.create(bind=engine)
+    try:
+        with sa.orm.Session(bind=engine) as session:
+            session.add_all([Pair(left=1, right=2, label="x"), Pair(left=2, right=1)])
+            session.flush()
+            results = sorted(iter_flags(session, Pair, Pair.has_label))
+            assert results == [((1, 2), True), ((2, 1), False)]
+    finally:
+        Pair.__table__.drop(bind=engine)
+
+
+def test_iter_flags_rejects_other_attributes(Message, session):
+    with pytest.raises(TypeError, match="Not a column flag"):
+        list(iter_flags(session, Message, Message.content))
+
+
+# Counting flags
+def test_count_flags(Message, session, messages):
+    flags = [Message.has_content, Message.is_sent, Message.in_transit]
+    assert count_flags(session, Message, flags) == (2, 2, 1)
+
+
+def test_count_flags_single_query(Message, engine, session, messages):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sa.event.listen(engine, "before_cursor_execute", record)
+    try:
+        count_flags(session, Message, [Message.has_content, Message.is_sent])
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", record)
+    assert len(statements) == 1
+
+
+def test_count_flags_no_rows(Message, session):
+    assert count_flags(session, Message, [Message.has_content]) == (0,)
+
+
+def test_count_flags_group_by(Message, session, messages):
+    flags = [Message.has_content, Message.in_transit]
+    counts = count_flags(session, Message, flags, group_by=Message.sent_at)
+    assert counts == {None: (1, 0), datetime(2020, 1, 1): (1, 1)}
+
+
+def test_count_flags_polymorphic(Booking, Cancellable, session):
+    session.add(Booking(paid_at=datetime(2020, 1, 1)))
+    session.add(Cancellable(cancelled_at=datetime(2020, 1, 1)))
+    session.flush()
+    assert count_flags(session, Booking, [Booking.is_paid]) == (1,)
+    flags = [Cancellable.is_paid, Cancellable.is_cancelled]
+    assert count_flags(session, Cancellable, flags) == (0, 1)
+
+
+def test_count_flags_rejects_other_attributes(Message, session):
+    with pytest.raises(TypeError, match="Not a column flag"):
+        count_flags(session, Message, [Message.content])
+
+
+# Preloading flags
+def test_load_flags(Message, session, messages):
+    session.expunge_all()
+    options = sa.orm.defer(Message.content), load_flags(Message.has_content)
+    loaded = session.scalars(sa.select(Message).options(*options)).all()
+    assert {msg.id: msg.has_content for msg in loaded} == {
+        messages[0].id: True,
+        messages[1].id: False,
+        messages[2].id: True,
+    }
+    assert all("content" in sa.inspect(msg).unloaded for msg in loaded)
+
+
+def test_load_flags_multiple(Message, session, messages):
+    session.expunge_all()
+    flags = load_flags(Message.has_content, Message.is_sent)
+    statement = sa.select(Message).options(sa.orm.defer(Message.content), flags)
+    message = session.scalars(statement.filter_by(id=messages[0].id)).one()
+    assert message.has_content is True
+    assert message.is_sent is True
+
+
+def test_load_flags_loaded_columns_take_precedence(Message, session, messages):
+    session.expunge_all()
+    statement = sa.select(Message).options(load_flags(Message.has_content))
+    message = session.scalars(statement.filter_by(id=messages[0].id)).one()
+    message.content = None
+    assert message.has_content is False
+
+
+def test_load_flags_modified_column(Message, session, messages):
+    session.expunge_all()
+    options = sa.orm.defer(Message.delivered_at), load_flags(Message.in_transit)
+    message = session.scalars(sa.select(Message).options(*options)).first()
+    preloaded = message.in_transit
+    message.sent_at = None
+    assert (preloaded, message.in_transit) == (True, False)
+    assert "delivered_at" in sa.inspect(message).unloaded
+
+
+def test_load_flags_inherited(Booking, Cancellable, session):
+    session.add(Cancellable(paid_at=datetime(2020, 1, 1)))
+    session.flush()
+    session.expunge_all()
+    options = sa.orm.defer(Cancellable.paid_at), load_flags(Cancellable.is_paid)
+    booking = session.scalars(sa.select(Cancellable).options(*options)).one()
+    assert booking.is_paid is True
+    assert "paid_at" in sa.inspect(booking).unloaded
+    assert sa.inspect(Booking).has_property("_is_paid_preloaded")
+
+
+def test_load_flags_deferred_column(Base, engine):
+    class Document(Base):  # type: ignore
+        __tablename__ = "document"
+        id = sa.Column(sa.Integer, primary_key=True)
+        body = sa.orm.deferred(sa.Column(sa.Text))
+        has_body = column_flag(body, preload=True)
+
+    Document.__table__.create(bind=engine)
+    try:
+        with sa.orm.Session(bind=engine) as session:
+            session.add_all([Document(body="x" * 1000), Document()])
+            session.commit()
+            statement = sa.select(Document).options(load_flags(Document.has_body))
+            documents = session.scalars(statement.order_by(Document.id)).all()
+            assert [document.has_body for document in documents] == [True, False]
+            assert all("body" in sa.inspect(doc).unloaded for doc in documents)
+            documents[1].body = "y"
+            assert documents[1].has_body is True
+    finally:
+        Document.__table__.drop(bind=engine)
+
+
+def test_load_flags_requires_flags():
+    with pytest.raises(TypeError, match="At least one flag"):
+        load_flags()
+
+
+def test_load_flags_requires_class_attribute(Message):
+    with pytest.raises(TypeError, match="class attribute"):
+        load_flags(vars(Message)["has_content"])
+
+
+def test_load_flags_not_preloadable(Message):
+    with pytest.raises(TypeError, match="preload=True"):
+        load_flags(Message.is_delivered)
+
+
+def test_preloaded_attribute_only_for_preloadable_flags(Message):
+    sa.orm.configure_mappers()
+    mapper = sa.inspect(Message)
+    assert mapper.has_property("_has_content_preloaded")
+    assert not mapper.has_property("_is_delivered_preloaded")
+
+
+def test_preloaded_key_unbound_flag(Message):
+    flag = column_flag(Message.__table__.c.content, preload=True)
+    mapper = sa.inspect(Message)
+    mapper.dispatch.mapper_configured(mapper, Message)
+    with pytest.raises(TypeError, match="not an attribute of Message"):
+        get_derived_column(flag).preloaded_key(Message)
+
+
+def test_load_flags_other_class(Booking, Message):
+    with pytest.raises(TypeError, match="not an attribute of Message"):
+        load_flags(Message.has_content, Booking.is_paid)
+
+
+# Loading flag columns
+def test_flag_attributes(Message):
+    attributes = flag_attributes(Message.in_transit, Message.is_sent)
+    assert [attribute.key for attribute in attributes] == ["delivered_at", "sent_at"]
+
+
+def test_flag_attributes_load_only(Message, session, messages):
+    session.expunge_all()
+    attributes = flag_attributes(Message.in_transit)
+    statement = sa.select(Message).options(sa.orm.load_only(*attributes))
+    loaded = session.scalars(statement.order_by(Message.id)).all()
+    assert [msg.in_transit for msg in loaded] == [True, False, False]
+    assert all("content" in sa.inspect(msg).unloaded for msg in loaded)
+
+
+def test_undefer_flags(Base, engine):
+    class Attachment(Base):  # type: ignore
+        __tablename__ = "attachment"
+        id = sa.Column(sa.Integer, primary_key=True)
+        data = sa.orm.deferred(sa.Column(sa.LargeBinary))
+        has_data = column_flag(data)
+
+    Attachment.__table__.create(bind=engine)
+    try:
+        with sa.orm.Session(bind=engine) as session:
+            session.add(Attachment(data=b"data"))
+            session.commit()
+            options = undefer_flags(Attachment.has_data)
+            attachment = session.scalars(sa.select(Attachment).options(options)).one()
+            assert "data" not in sa.inspect(attachment).unloaded
+            assert attachment.has_data is True
+    finally:
+        Attachment.__table__.drop(bind=engine)
+
+
+# Strict loading
+@pytest.fixture
+def deferred_message(Message, session, messages):
+    session.expunge_all()
+    statement = sa.select(Message).options(sa.orm.defer(Message.content))
+    return session.scalars(statement.filter_by(id=messages[0].id)).one()
+
+
+def test_strict_loading_raise(deferred_message):
+    with strict_loading("raise"):
+        with pytest.raises(sa.exc.InvalidRequestError, match="lazy loads content"):
+            deferred_message.has_content
+        assert deferred_message.is_sent is True
+
+
+def test_strict_loading_warn(deferred_message):
+    with strict_loading("warn"):
+        with pytest.warns(RuntimeWarning, match="lazy loads content"):
+            assert deferred_message.has_content is True
+
+
+@pytest.mark.parametrize(
+    "flag", ["has_body", "has_body_cached", "has_body_lazy", "has_body_lazy_cached"]
+)
+def test_strict_loading_warns_at_caller(Base, engine, flag):
+    class Note(Base):  # type: ignore
+        __tablename__ = f"note_{flag}"
+        id = sa.Column(sa.Integer, primary_key=True)
+        body = sa.orm.deferred(sa.Column(sa.Text))
+        has_body = column_flag(body)
+        has_body_cached = column_flag(body, cache=True)
+        has_body_lazy = column_flag(body, lazy=True)
+        has_body_lazy_cached = column_flag(body, lazy=True, cache=True)
+
+    Note.__table__.create(bind=engine)
+    try:
+        with sa.orm.Session(bind=engine) as session:
+            session.add(Note(body="Spam"))
+            session.commit()
+            note = session.scalars(sa.select(Note)).one()
+            with strict_loading("warn"), pytest.warns(RuntimeWarning) as record:
+                assert getattr(note, flag) is True
+            assert [warning.filename for warning in record] == [__file__]
+    finally:
+        Note.__table__.drop(bind=engine)
+
+
+def test_strict_loading_restored(deferred_message):
+    with strict_loading("raise"):
+        with strict_loading(None):
+            pass
+        with pytest.raises(sa.exc.InvalidRequestError, match="lazy loads content"):
+            deferred_message.has_content
+    assert deferred_message.has_content is True
+
+
+def test_strict_loading_other_thread(deferred_message):
+    entered, released = threading.Event(), threading.Event()
+
+    def hold_strict_loading():
+        with strict_loading("raise"):
+            entered.set()
+            released.wait()
+
+    thread = threading.Thread(target=hold_strict_loading)
+    thread.start()
+    try:
+        entered.wait()
+        assert deferred_message.has_content is True
+    finally:
+        released.set()
+        thread.join()
+
+
+def test_strict_loading_preloaded(Message, session, messages):
+    session.expunge_all()
+    options = sa.orm.defer(Message.content), load_flags(Message.has_content)
+    message = session.scalars(sa.select(Message).options(*options)).first()
+    with strict_loading("raise"):
+        assert message.has_content is True
+
+
+def test_strict_loading_new_object(Message):
+    with strict_loading("raise"):
+        assert Message().has_content is False
+
+
+@pytest.fixture
+def process_strict_loading():
+    yield use_strict_loading
+    use_strict_loading(None)
+
+
+def test_use_strict_loading(deferred_message, process_strict_loading):
+    process_strict_loading("raise")
+    with pytest.raises(sa.exc.InvalidRequestError, match="lazy loads content"):
+        deferred_message.has_content
+    with strict_loading(None):
+        assert deferred_message.has_content is True
+
+
+def test_strict_loading_unknown_mode():
+    with pytest.raises(ValueError, match="Unknown strict loading mode"):
+        use_strict_loading("ignore")
+    with pytest.raises(ValueError, match="Unknown strict loading mode"):
+        with strict_loading("ignore"):
+            pass  # pragma: no cover
+
+
+# Translating flags in bulk mappings
+def test_translate_flags(Message):
+    mappings: List[Dict[str, Any]] = [
+        {"content": "Spam", "is_sent_scalar": True},
+        {"content": "Eggs", "is_sent_scalar": False},
+        {"content": "Ham"},
+    ]
+    assert translate_flags(Message, mappings) == [
+        {"content": "Spam", "sent_at": datetime(2020, 1, 1)},
+        {"content": "Eggs", "sent_at": None},
+        {"content": "Ham"},
+    ]
+    assert mappings[0] == {"content": "Spam", "is_sent_scalar": True}
+
+
+def test_translate_flags_column_keys(Message):
+    mappings = [{"is_delivered": False}]
+    assert translate_flags(Message, mappings) == [{"delivered_at": None}]
+    assert translate_flags(Message, mappings, column_keys=True) == [
+        {"delivery_date": None}
+    ]
+
+
+def test_translate_flags_default_called_once(Message):
+    with freeze_time(auto_tick_seconds=1):
+        mappings = translate_flags(Message, [{"is_delivered": True}] * 3)
+    assert len({mapping["delivered_at"] for mapping in mappings}) == 1
+
+
+def test_translate_flags_bulk_insert_mappings(Message, session):
+    mappings: List[Dict[str, Any]] = [
+        {"content": "Spam", "is_sent_scalar": True},
+        {"is_sent": False},
+    ]
+    session.bulk_insert_mappings(Message, translate_flags(Message, mappings))
+    statement = sa.select(Message).order_by(Message.id)
+    assert [msg.is_sent for msg in session.scalars(statement)] == [True, False]
+
+
+def test_translate_flags_orm_bulk_insert(Message, session):
+    mappings = [{"is_sent_scalar": True}, {"is_sent": False}]
+    session.execute(sa.insert(Message), translate_flags(Message, mappings))
+    statement = sa.select(Message).order_by(Message.id)
+    assert [msg.is_sent for msg in session.scalars(statement)] == [True, False]
+
+
+def test_translate_flags_core_insert(Message, session):
+    mappings = [
+        {"is_delivered": True, "is_sent": True},
+        {"is_delivered": False, "is_sent": False},
+    ]
+    values = translate_flags(Message, mappings, column_keys=True)
+    session.execute(sa.insert(Message.__table__).values(values))
+    statement = sa.select(Message).order_by(Message.id)
+    messages = session.scalars(statement).all()
+    assert [msg.is_delivered for msg in messages] == [True, False]
+    assert [msg.is_sent for msg in messages] == [True, False]
+
+
+def test_translate_flags_bulk_update_mappings(Message, session, messages):
+    mappings = [{"id": message.id, "is_sent": False} for message in messages]
+    session.bulk_update_mappings(Message, translate_flags(Message, mappings))
+    session.expire_all()
+    assert not any(message.is_sent for message in messages)
+
+
+def test_translate_flags_without_default(Message):
+    with pytest.raises(TypeError, match="without default"):
+        translate_flags(Message, [{"has_content": True}])
+
+
+def test_translate_flags_non_bool(Message):
+    with pytest.raises(TypeError, match="boolean"):
+        translate_flags(Message, [{"is_sent": 1}])
+
+
+def test_translate_flags_conflicting_column(Message):
+    with pytest.raises(ValueError, match="Both flag is_sent and its column sent_at"):
+        translate_flags(Message, [{"is_sent": True, "sent_at": None}])
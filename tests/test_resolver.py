@@ -1,11 +1,18 @@
+import gc
+import weakref
+
 import pytest
-from sqlalchemy import Column, Integer, MetaData, Table, Text
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, Text
 from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import Mapper, configure_mappers
 
-from sqlalchemy_hybrid_utils import column_flag
+from sqlalchemy_hybrid_utils import DerivedColumn, column_flag
+from sqlalchemy_hybrid_utils.cache import FlagCache
+from sqlalchemy_hybrid_utils.derived_column import get_derived_column
 from sqlalchemy_hybrid_utils.resolver import (
     AttributeResolver,
     PrefetchedAttributeResolver,
+    RowResolver,
 )
 
 try:  # Try modern SQLAlchemy 1.4 / 2.0 first
@@ -130,3 +137,90 @@ def test_column_flag_prefetch_switch(prefetch):
     mapped.has_value = True
     assert mapped.has_value
     assert mapped.value == "eggs"
+
+
+def test_attribute_names(Thing, column_map, make_resolver):
+    resolver = make_resolver(column_map.values())
+    names = resolver.attribute_names(Thing)
+    assert {column: names[column] for column in column_map.values()} == {
+        column: name for name, column in column_map.items()
+    }
+
+
+def test_attribute_names_shared_across_flags(Message):
+    configure_mappers()
+    has_content = get_derived_column(Message.has_content).resolver
+    in_transit = get_derived_column(Message.in_transit).resolver
+    assert has_content.attribute_names(Message) is in_transit.attribute_names(Message)
+
+
+def test_attribute_names_cached_until_configured(Thing, column_map):
+    resolver = AttributeResolver(set(column_map.values()))
+    names = resolver.attribute_names(Thing)
+    assert resolver.attribute_names(Thing) is names
+    mapper = inspect(Thing).mapper
+    mapper.dispatch.mapper_configured(mapper, Thing)
+    assert resolver.attribute_names(Thing) is not names
+    assert resolver.attribute_names(Thing) == names
+
+
+def test_row_resolver_positions(column_map):
+    selected = [column_map["renamed"], column_map["named"]]
+    resolver = RowResolver({column_map["named"]}, selected)
+    assert resolver.positions == {column_map["named"]: 1}
+    assert resolver.read_column(column_map["named"])(("spam", "eggs")) == "eggs"
+
+
+def test_row_resolver_missing_column(column_map):
+    with pytest.raises(ValueError, match="not present in selection: .*unnamed"):
+        RowResolver(set(column_map.values()), [column_map["named"]])
+
+
+def test_prefetched_names_do_not_keep_classes_alive():
+    table = Table("shared", MetaData(), Column("value", Text, primary_key=True))
+    resolver = PrefetchedAttributeResolver({table.c.value})
+
+    class Shared:
+        pass
+
+    map_class_imperatively(Shared, table)
+    configure_mappers()
+    assert resolver.single_name(Shared()) == "value"
+    assert len(resolver.targets) == 1
+    del Shared
+    gc.collect()
+    assert len(resolver.targets) == 0
+
+
+def create_tenant_model(number):
+    class Tenant(declarative_base()):  # type: ignore
+        __tablename__ = f"tenant_{number}"
+        id = Column(Integer, primary_key=True)
+        name = Column(Text)
+        deleted_at = Column(DateTime)
+        has_name = column_flag(name, default="anonymous")
+        is_active = column_flag(~deleted_at, cache=True)
+        is_named_active = column_flag(name & ~deleted_at)
+
+    tenant = Tenant(name="spam")
+    assert tenant.has_name and tenant.is_active and tenant.is_named_active
+    return weakref.ref(Tenant)
+
+
+def test_dynamic_mapped_classes_are_collected():
+    """Creating and dropping many mapped classes with flags does not leak."""
+
+    def create_and_drop(count):
+        references = [create_tenant_model(number) for number in range(count)]
+        gc.collect()
+        assert not any(reference() for reference in references)
+
+    def count_retained():
+        retained = (Mapper, Table, DerivedColumn, FlagCache)
+        gc.collect()
+        return sum(isinstance(obj, retained) for obj in gc.get_objects())
+
+    create_and_drop(50)
+    baseline = count_retained()
+    create_and_drop(300)
+    assert count_retained() <= baseline
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Boolean, Column, DateTime, Integer, and_, or_
+
+from sqlalchemy_hybrid_utils.expression import Expression, rephrase_as_boolean
+from sqlalchemy_hybrid_utils.specialize import specialized_getter
+
+BOOL_A = Column("bool_a", Boolean)
+DATE_A = Column("date_a", DateTime)
+DATE_B = Column("date_b", DateTime)
+DATE_C = Column("date_c", DateTime)
+INT_A = Column("int_a", Integer)
+
+
+class Thing:
+    """Plain object standing in for mapped instances."""
+
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+TARGETS = {Thing: {DATE_A: "a", DATE_B: "b", DATE_C: "c"}}
+
+
+def unloaded(orm_obj):
+    """Stands in for evaluating the flag on an object with unloaded columns."""
+    return "unloaded"
+
+
+def getter_for(expr):
+    program = tuple(Expression(rephrase_as_boolean(expr)).optimized)
+    return specialized_getter(program, TARGETS, unloaded)
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        pytest.param(BOOL_A, id="boolean column"),
+        pytest.param(INT_A > 5, id="comparison"),
+        pytest.param(INT_A == 5, id="equality to literal"),
+        pytest.param(DATE_A & (INT_A > 5), id="mixed clauses"),
+        pytest.param(DATE_A & BOOL_A, id="mixed with boolean column"),
+        pytest.param(and_(DATE_A, or_(DATE_B, DATE_C)), id="nested clauses"),
+    ],
+)
+def test_unsupported_shapes(expr):
+    assert getter_for(expr) is None
+
+
+@pytest.mark.parametrize(
+    "expr, attrs, expected",
+    [
+        pytest.param(DATE_A, {"a": datetime.now()}, True, id="IS NOT NULL: set"),
+        pytest.param(DATE_A, {"a": None}, False, id="IS NOT NULL: unset"),
+        pytest.param(~DATE_A, {"a": None}, True, id="IS NULL: unset"),
+        pytest.param(~DATE_A, {"a": datetime.now()}, False, id="IS NULL: set"),
+    ],
+)
+def test_single_null_check(expr, attrs, expected):
+    getter = getter_for(expr)
+    assert getter(Thing(**attrs)) is expected
+    assert getter(Thing()) == "unloaded"
+
+
+@pytest.mark.parametrize(
+    "expr, attrs, expected",
+    [
+        (DATE_A & ~DATE_B, {"a": 1, "b": None}, True),
+        (DATE_A & ~DATE_B, {"a": 1, "b": 1}, False),
+        (DATE_A & ~DATE_B, {"a": None}, False),
+        (or_(DATE_A, DATE_B, DATE_C), {"a": None, "b": None, "c": None}, False),
+        (or_(DATE_A, DATE_B, DATE_C), {"a": None, "b": 1}, True),
+    ],
+)
+def test_multi_null_check(expr, attrs, expected):
+    assert getter_for(expr)(Thing(**attrs)) is expected
+
+
+def test_multi_null_check_unloaded():
+    getter = getter_for(DATE_A | DATE_B)
+    assert getter(Thing(a=1)) is True
+    assert getter(Thing(a=None)) == "unloaded"
@@ -0,0 +1,116 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Boolean, Column, DateTime, Integer, Text, and_, func, literal
+
+from sqlalchemy_hybrid_utils.expression import Expression, rephrase_as_boolean
+
+numpy = pytest.importorskip("numpy")
+
+BOOL_A = Column("bool_a", Boolean)
+BOOL_B = Column("bool_b", Boolean)
+DATE = Column("date", DateTime)
+INT_A = Column("int_a", Integer)
+INT_B = Column("int_b", Integer)
+TEXT = Column("text", Text)
+
+
+def evaluate(expr, arrays):
+    result = Expression(rephrase_as_boolean(expr)).evaluate_arrays(arrays)
+    assert result.dtype == bool
+    return result.tolist()
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        pytest.param(["a", None, ""], [True, False, True], id="objects"),
+        pytest.param([1.0, numpy.nan, 0.0], [True, False, True], id="floats"),
+        pytest.param(
+            numpy.array(["2020-01-01", "NaT", "2020-01-02"], dtype="datetime64[s]"),
+            [True, False, True],
+            id="datetimes",
+        ),
+        pytest.param([1, 2, 3], [True, True, True], id="integers"),
+    ],
+)
+def test_is_not_null(values, expected):
+    assert evaluate(TEXT, {TEXT: values}) == expected
+    assert evaluate(~TEXT, {TEXT: values}) == [not value for value in expected]
+
+
+def test_comparison_operators():
+    arrays = {INT_A: [1, 5, 10], INT_B: [5, 5, 5]}
+    assert evaluate(INT_A > INT_B, arrays) == [False, False, True]
+    assert evaluate(INT_A <= 5, arrays) == [True, True, False]
+    assert evaluate(INT_A == INT_B, arrays) == [False, True, False]
+
+
+def test_comparison_with_null_is_false():
+    arrays = {INT_A: [1, None, 10]}
+    assert evaluate(INT_A > 0, arrays) == [True, False, True]
+    assert evaluate(INT_A != 1, arrays) == [False, False, True]
+
+
+def test_logical_operators():
+    arrays = {BOOL_A: [True, True, False, None], BOOL_B: [True, False, True, True]}
+    assert evaluate(BOOL_A & BOOL_B, arrays) == [True, False, False, False]
+    assert evaluate(BOOL_A | BOOL_B, arrays) == [True, True, True, True]
+    assert evaluate(~BOOL_A, arrays) == [False, False, True, True]
+    assert evaluate(~(BOOL_A & BOOL_B), arrays) == [False, True, True, True]
+
+
+def test_multi_clause_and_mixed():
+    arrays = {TEXT: ["a", "b", None], DATE: [None, datetime.now(), None]}
+    arrays[INT_A] = [1, 2, 3]
+    expr = and_(TEXT, ~DATE, INT_A < 3)
+    assert evaluate(expr, arrays) == [True, False, False]
+
+
+def test_in_literal_list():
+    arrays = {INT_A: [1, 4, None, 6]}
+    assert evaluate(INT_A.in_([1, 2, 4]), arrays) == [True, True, False, False]
+
+
+def test_in_grouping():
+    arrays = {INT_A: [1, 4, 6], INT_B: [1, 2, 3]}
+    expr = INT_A.in_([INT_B, INT_B * 2])
+    assert evaluate(expr, arrays) == [True, True, True]
+    assert evaluate(INT_A.in_([INT_B, 5]), arrays) == [True, False, False]
+
+
+def test_arithmetic():
+    arrays = {INT_A: [1, 4, 6], INT_B: [1, 2, 3]}
+    assert evaluate((INT_A - INT_B) > 1, arrays) == [False, True, True]
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        pytest.param(func.lower(TEXT) == "a", id="function"),
+        pytest.param(TEXT.like("a%"), id="operator"),
+        pytest.param(DATE < func.now(), id="current time"),
+    ],
+)
+def test_unsupported_function(expr):
+    arrays = {TEXT: ["a", "B"], DATE: [datetime.now(), None]}
+    with pytest.raises(TypeError, match="not supported for array evaluation"):
+        evaluate(expr, arrays)
+
+
+def test_constant_expression_broadcast():
+    arrays = {BOOL_A: [True, False]}
+    assert evaluate(BOOL_A | (literal(1) == 1), arrays) == [True, True]
+
+
+def test_lookup_by_column_name():
+    arrays = {"int_a": numpy.array([1, 2, 3])}
+    assert evaluate(INT_A > 1, arrays) == [False, True, True]
+
+
+def test_pandas_dataframe():
+    pandas = pytest.importorskip("pandas")
+    frame = pandas.DataFrame(
+        {"text": ["a", None, "c"], "date": [datetime.now(), None, None]}
+    )
+    assert evaluate(TEXT & ~DATE, frame) == [False, False, True]